@@ -1,11 +1,13 @@
 """
 SYNOPSIS
-    TODO helloworld [-h,--help] [-v,--verbose] [--version]
+    python -m VC_collections.AuthorityFiles [-h,--help] [--refresh] [--offline] [--status]
 
 DESCRIPTION
-    TODO This describes how to use this script. This docstring
-    will be printed by the script if there is an error or
-    if the user requests help (-h or --help).
+    The controlled vocabularies (Authority files) of the project, read from the Authority Google
+    Spreadsheet. The worksheets are kept in a local snapshot (data/authority_snapshot), which is
+    re-validated against Google Drive once the snapshot is older than the staleness TTL
+    (VC_AUTHORITY_TTL_HOURS, default 24 hours). Set VC_AUTHORITY_OFFLINE=1 to run the whole
+    pipeline against the last snapshot without any network access.
     
 PROJECT NAME:
     helper_fuctions
@@ -23,6 +25,11 @@ VERSION
     $
 """
 
+import argparse
+import logging
+import os
+import sys
+from datetime import timedelta
 from pathlib import Path
 
 import gspread
@@ -31,6 +38,21 @@ import pandas as pd
 from oauth2client.service_account import ServiceAccountCredentials
 
 from VC_collections.files import create_df_from_gs
+from VC_collections.snapshot import SnapshotStore, get_modified_time
+
+AUTHORITY_SPREADSHEET_ID = "1736sL9unbiOMbcrIYgSkCSvhU2-LCthSLVtYLPSpZ98"
+AUTHORITY_WORKSHEETS = [
+    "מדיה פורמט",
+    "סוג חומר",
+    "סוגי ארגונים-תפקידים",
+    "סוגי אישים-תפקידים",
+    "שם הרושם",
+    "מדינת פרסום",
+    "שפה",
+    "קרדיטים",
+    "מגבלות פרטיות",
+    "רמת תיאור",
+]
 
 mapper_655_to_999 = {
     "טבלת חישובי שטחים": "CHART",
@@ -189,101 +211,436 @@ def create_privacy_mapping_dict(df_privacy_values):
     return privacy_mapping_dict, privacy_search_dict
 
 
+def connect_to_authority_spreadsheet():
+    """
+    Authorizes with the google drive api and opens the Authority spreadsheet.
+    :return: the gspread client and the Authority spreadsheet
+    """
+    # use creds to create a client to interact with the Google Drive API
+    scope = [
+        "https://spreadsheets.google.com/feeds",
+        "https://www.googleapis.com/auth/drive.readonly",
+    ]
+    try:
+        creds = ServiceAccountCredentials.from_json_keyfile_name(
+            "google_drive_api/client_secret.json", scope
+        )
+    except OSError as e:
+        creds = ServiceAccountCredentials.from_json_keyfile_name(
+            r"C:\Users\Yaelg\Google "
+            r"Drive\National_Library\Python\VC_Preprocessing"
+            r"\google_drive_api\client_secret.json",
+            scope,
+        )
+    client = gspread.authorize(creds)
+    spreadsheet = client.open_by_key(AUTHORITY_SPREADSHEET_ID)
+    return client, spreadsheet
+
+
+def is_offline():
+    return os.environ.get("VC_AUTHORITY_OFFLINE", "").lower() not in ("", "0", "false")
+
+
+class lazy_property:
+    """
+    A memoized, read-only property - the value is computed on first access and then stored on the instance.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self.func(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
 class Authority:
+    """
+    The controlled vocabularies of the project. Every table is fetched and parsed only when it is first
+    used, so creating an instance costs nothing.
+    """
+
     BASE_PATH = Path.cwd()
+    SNAPSHOT_PATH = BASE_PATH / "data" / "authority_snapshot"
+    SNAPSHOT_TTL = timedelta(
+        hours=float(os.environ.get("VC_AUTHORITY_TTL_HOURS", 24))
+    )
 
-    def __init__(self):
-        # use creds to create a client to interact with the Google Drive API
-        scope = ["https://spreadsheets.google.com/feeds"]
-        try:
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                "google_drive_api/client_secret.json", scope
-            )
-        except OSError as e:
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                r"C:\Users\Yaelg\Google "
-                r"Drive\National_Library\Python\VC_Preprocessing"
-                r"\google_drive_api\client_secret.json",
-                scope,
+    def __init__(self, offline=None, refresh=False):
+        """
+        :param offline: use only the local snapshot, without connecting to Google Drive.
+            Defaults to the VC_AUTHORITY_OFFLINE environment variable.
+        :param refresh: download the worksheets, even if the local snapshot is up to date.
+        """
+        self.offline = is_offline() if offline is None else offline
+        self.refresh = refresh
+        self.snapshot = SnapshotStore(self.SNAPSHOT_PATH, AUTHORITY_SPREADSHEET_ID)
+        self._worksheets = {}
+        self._client = None
+        self._spreadsheet = None
+        self._remote_available = None
+
+    @property
+    def spreadsheet(self):
+        if self._spreadsheet is None:
+            self._client, self._spreadsheet = connect_to_authority_spreadsheet()
+        return self._spreadsheet
+
+    def check_remote(self):
+        """
+        Fetches the modifiedTime of the Authority spreadsheet (once per instance) and records it in the
+        snapshot manifest. A failed check is not recorded, so the snapshot keeps its last validation time.
+        :return: True if Google Drive could be reached, False otherwise
+        """
+        if self._remote_available is None:
+            logger = logging.getLogger(__name__)
+            try:
+                self.spreadsheet
+                modified_time = get_modified_time(
+                    self._client, AUTHORITY_SPREADSHEET_ID
+                )
+            except Exception as e:
+                logger.warning(f"[AUTHORITY] Could not connect to Google Drive ({e})")
+                modified_time = None
+            self._remote_available = modified_time is not None
+            if self._remote_available:
+                self.snapshot.mark_checked(modified_time)
+        return self._remote_available
+
+    def download_worksheet(self, sheet):
+        """
+        Downloads a single Authority worksheet from Google Sheets and saves it to the snapshot.
+        :param sheet: the name of the worksheet
+        :return: the worksheet as a DataFrame
+        """
+        logging.getLogger(__name__).info(
+            f"[AUTHORITY] Downloading [{sheet}] from Google Sheets"
+        )
+        df, cols = create_df_from_gs(self.spreadsheet, sheet)
+        self.snapshot.save_sheet(sheet, df, self.snapshot.manifest["modified_time"])
+        return df
+
+    def worksheet(self, sheet):
+        """
+        Returns a single Authority worksheet - from the local snapshot if it is up to date, otherwise
+        downloads it from Google Sheets and saves it to the snapshot.
+
+        A worksheet is up to date if it was saved from the latest known version (modifiedTime) of the
+        spreadsheet, and that version was checked against Google Drive within the last SNAPSHOT_TTL.
+        If Google Drive cannot be reached, the worksheet is loaded from the last snapshot (if there is one),
+        except when a refresh was requested - then the process exits with an error.
+        The worksheets downloaded (loads) and the worksheets reused from memory or from the snapshot
+        (hits) are counted in authority_stats.
+        :param sheet: the name of the worksheet
+        :return: the worksheet as a DataFrame
+        """
+        if sheet in self._worksheets:
+            authority_stats["hits"] += 1
+            return self._worksheets[sheet]
+
+        logger = logging.getLogger(__name__)
+        has_snapshot = self.snapshot.has_sheet(sheet)
+        downloaded = False
+
+        if self.offline:
+            if not has_snapshot:
+                sys.stderr.write(
+                    f"[AUTHORITY] Offline mode, but there is no snapshot of [{sheet}] in {self.SNAPSHOT_PATH}.\n"
+                    f"Please run: python -m VC_collections.AuthorityFiles --refresh\n"
+                )
+                sys.exit()
+            df = self.snapshot.load_sheet(sheet)
+
+        elif (
+            not self.refresh
+            and self.snapshot.is_current(sheet)
+            and not self.snapshot.is_stale(self.SNAPSHOT_TTL)
+        ):
+            df = self.snapshot.load_sheet(sheet)
+
+        elif self.refresh:
+            # a refresh must not quietly fall back to the (possibly stale) snapshot
+            if not self.check_remote():
+                sys.stderr.write(
+                    f"[AUTHORITY] Cannot refresh [{sheet}] - Google Drive is unreachable.\n"
+                )
+                sys.exit()
+            try:
+                df = self.download_worksheet(sheet)
+            except Exception as e:
+                sys.stderr.write(f"[AUTHORITY] Cannot refresh [{sheet}] - {e}\n")
+                sys.exit()
+            downloaded = True
+
+        elif has_snapshot and not self.check_remote():
+            logger.warning(
+                f"[AUTHORITY] Google Drive is unreachable, loading [{sheet}] from the last snapshot"
             )
-        client = gspread.authorize(creds)
-        spreadsheet = client.open_by_url(
-            "https://docs.google.com/spreadsheets/d/1736sL9unbiOMbcrIYgSkCSvhU2-LCthSLVtYLPSpZ98"
+            df = self.snapshot.load_sheet(sheet)
+
+        elif self.snapshot.is_current(sheet):
+            df = self.snapshot.load_sheet(sheet)
+
+        else:
+            self.check_remote()
+            try:
+                df = self.download_worksheet(sheet)
+            except Exception as e:
+                if not has_snapshot:
+                    raise
+                logger.warning(
+                    f"[AUTHORITY] Could not download [{sheet}] ({e}), "
+                    f"loading it from the last snapshot"
+                )
+                df = self.snapshot.load_sheet(sheet)
+            else:
+                downloaded = True
+
+        authority_stats["loads" if downloaded else "hits"] += 1
+        self._worksheets[sheet] = df
+        return df
+
+    def load_worksheets(self):
+        """
+        Loads all the Authority worksheets (see worksheet()).
+        :return: a dictionary of worksheet name -> DataFrame
+        """
+        return {sheet: self.worksheet(sheet) for sheet in AUTHORITY_WORKSHEETS}
+
+    @lazy_property
+    def _media_format(self):
+        return order_media_format(self.worksheet("מדיה פורמט"))
+
+    @property
+    def df_media_format_auth(self):
+        return self._media_format[0]
+
+    @property
+    def media_format_mapping_dict(self):
+        return self._media_format[1]
+
+    @lazy_property
+    def _archival_material(self):
+        return order_archival_material(self.worksheet("סוג חומר"))
+
+    @property
+    def df_arch_mat_auth(self):
+        return self._archival_material[0]
+
+    @property
+    def df_arch_mat_search(self):
+        return self._archival_material[1]
+
+    @property
+    def arch_mat_mapping_dict(self):
+        return self._archival_material[2]
+
+    @property
+    def arch_mat_search_dict(self):
+        return self._archival_material[3]
+
+    @lazy_property
+    def arch_mat_map_336(self):
+        """
+        archival material term -> the RDA content type (MARC 336) of the term
+        """
+        return (
+            self.df_arch_mat_auth.loc[:, ["ARCHIVAL_MATERIAL", "rdacontent 336"]]
+            .set_index("ARCHIVAL_MATERIAL")
+            .to_dict()["rdacontent 336"]
         )
 
-        # fetch all tables
-        df_media_format_auth, media_cols = create_df_from_gs(spreadsheet, "מדיה פורמט")
-        df_arch_mat_auth, archival_cols = create_df_from_gs(spreadsheet, "סוג חומר")
+    @lazy_property
+    def df_arch_mat_mapping(self):
+        df_arch_mat_auth = self.worksheet("סוג חומר")
         df_arch_mat_labels = ["ARCHIVAL_MATERIAL", "MARC21 655 7", "rdacontent 336"]
-        df_arch_mat_mapping = df_arch_mat_auth.loc[
+        return df_arch_mat_auth.loc[
             df_arch_mat_auth.index.intersection(df_arch_mat_labels)
         ]
-        df_creator_corps_role, corps_role_cols = create_df_from_gs(
-            spreadsheet, "סוגי ארגונים-תפקידים"
-        )
-        df_creator_corps_role = df_creator_corps_role.rename(
+
+    @lazy_property
+    def df_creator_corps_role(self):
+        return self.worksheet("סוגי ארגונים-תפקידים").rename(
             columns={"סוגי ארגונים": "CREATOR_CROPS_ROLE"}
         )
-        df_creator_pers_role, pers_role_cols = create_df_from_gs(
-            spreadsheet, "סוגי אישים-תפקידים"
-        )
-        df_creator_pers_role = df_creator_pers_role.rename(
+
+    @lazy_property
+    def df_creator_pers_role(self):
+        return self.worksheet("סוגי אישים-תפקידים").rename(
             columns={"מילות מפתח - סוגי אישים בפרוייקט": "CREATOR_PERS_ROLE"}
         )
-        df_catalogers, cataloger_cols = create_df_from_gs(spreadsheet, "שם הרושם")
-        df_catalogers = df_catalogers.set_index("שם הרושם")
-        cataloger_name_mapper = df_catalogers.to_dict()["קיצור אלף"]
 
-        df_countries, countries_cols = create_df_from_gs(spreadsheet, "מדינת פרסום")
-
-        roles_dict = {
-            "pers_roles": df_creator_pers_role["CREATOR_PERS_ROLE"].tolist(),
-            "corps_roles": df_creator_corps_role["CREATOR_CROPS_ROLE"].tolist(),
+    @lazy_property
+    def roles_dict(self):
+        return {
+            "pers_roles": self.df_creator_pers_role["CREATOR_PERS_ROLE"].tolist(),
+            "corps_roles": self.df_creator_corps_role["CREATOR_CROPS_ROLE"].tolist(),
         }
 
-        df_languages, languages_cols = create_df_from_gs(spreadsheet, "שפה")
-        df_languages = df_languages.set_index("שם שפה עברית")
+    @lazy_property
+    def relator_index(self):
+        """
+        the RDA relators of the creator roles, indexed by role:
+        role -> kind (PERS / CORPS) -> {"RELATOR_HEB": ..., "RELATOR_ENG": ...}
+        A role which appears in both the personalities and the corporations roles tables has both kinds.
+        """
+        relator_index = {}
+        for kind, df, role_col in (
+            ("PERS", self.df_creator_pers_role, "CREATOR_PERS_ROLE"),
+            ("CORPS", self.df_creator_corps_role, "CREATOR_CROPS_ROLE"),
+        ):
+            for role, relator_heb, relator_eng in zip(
+                df[role_col], df["RELATOR_HEB"], df["RELATOR_ENG"]
+            ):
+                relator_index.setdefault(role, {}).setdefault(
+                    kind, {"RELATOR_HEB": relator_heb, "RELATOR_ENG": relator_eng}
+                )
+        return relator_index
+
+    @lazy_property
+    def df_cataloguers(self):
+        return self.worksheet("שם הרושם").set_index("שם הרושם")
+
+    @lazy_property
+    def cataloger_name_mapper(self):
+        return self.df_cataloguers.to_dict()["קיצור אלף"]
+
+    @lazy_property
+    def df_countries(self):
+        return self.worksheet("מדינת פרסום")
+
+    @lazy_property
+    def countries_code_mapper(self):
+        """
+        country name (in Hebrew) -> MARC country code
+        """
+        return self.df_countries.set_index("מדינת פרסום").to_dict()["MARC"]
+
+    @lazy_property
+    def countries_mapping_dict(self):
+        countries = self.df_countries["מדינת פרסום"]
+        return pd.Series(countries.values, index=countries.values).to_dict()
+
+    @lazy_property
+    def df_languages(self):
+        return self.worksheet("שפה").set_index("שם שפה עברית")
+
+    @lazy_property
+    def language_code_mapper(self):
+        """
+        language name (in Hebrew) -> MARC language code
+        """
+        return self.df_languages["קוד שפה"].to_dict()
+
+    @lazy_property
+    def df_credits(self):
+        return order_credits(self.worksheet("קרדיטים").set_index("סימול הארכיון"))
+
+    @lazy_property
+    def df_privacy_values(self):
+        return self.worksheet("מגבלות פרטיות").set_index("מגבלות פרטיות")
+
+    @lazy_property
+    def _privacy_dicts(self):
+        return create_privacy_mapping_dict(self.df_privacy_values)
+
+    @property
+    def privacy_mapping_dict(self):
+        return self._privacy_dicts[0]
+
+    @property
+    def privacy_search_dict(self):
+        return self._privacy_dicts[1]
+
+    @lazy_property
+    def df_level(self):
+        return self.worksheet("רמת תיאור")
+
+    @property
+    def mapper_655_to_999(self):
+        return mapper_655_to_999
+
+
+_authority = None
+authority_stats = {"instances": 0, "loads": 0, "hits": 0}
+
+
+def get_authority():
+    """
+    The registry of the Authority instance shared by all the modules of the process - it is created
+    on the first call, and returned as is on every following call.
+    The number of instances created is counted in authority_stats (the loads and hits of the
+    worksheets are counted in Authority.worksheet).
+    :return: the shared Authority instance
+    """
+    global _authority
+    if _authority is None:
+        _authority = Authority()
+        authority_stats["instances"] += 1
+    return _authority
 
-        df_credits, credits_col = create_df_from_gs(spreadsheet, "קרדיטים")
-        df_credits = df_credits.set_index("סימול הארכיון")
 
-        df_privacy_values, copyright_cols = create_df_from_gs(
-            spreadsheet, "מגבלות פרטיות"
-        )
-        df_privacy_values = df_privacy_values.set_index("מגבלות פרטיות")
-        privacy_mapping_dict, privacy_search_dict = create_privacy_mapping_dict(
-            df_privacy_values
-        )
+def reset_authority():
+    """
+    Drops the shared Authority instance and resets authority_stats.
+    """
+    global _authority
+    _authority = None
+    authority_stats.update(instances=0, loads=0, hits=0)
 
-        df_level, level_cols = create_df_from_gs(spreadsheet, "רמת תיאור")
 
-        self.df_media_format_auth, self.media_format_mapping_dict = order_media_format(
-            df_media_format_auth
+class LazyAuthority:
+    """
+    Stands in for the shared Authority instance (see get_authority) - the instance is created only when
+    one of its tables is first used, and not when the module is imported.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_authority(), name)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Manage the local snapshot of the Authority files spreadsheet"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="download all the Authority worksheets and replace the local snapshot",
+    )
+    parser.add_argument(
+        "--offline", action="store_true", help="load only from the local snapshot"
+    )
+    parser.add_argument(
+        "--status", action="store_true", help="print the manifest of the local snapshot"
+    )
+    args = parser.parse_args()
+
+    if args.status:
+        snapshot = SnapshotStore(Authority.SNAPSHOT_PATH, AUTHORITY_SPREADSHEET_ID)
+        print(f"snapshot path: {snapshot.path}")
+        print(f"modified time: {snapshot.manifest['modified_time']}")
+        print(f"last checked: {snapshot.manifest['checked_at']} (age: {snapshot.age()})")
+        print(
+            "\n".join(
+                f"{sheet}: {entry['rows']} rows, saved at {entry['saved_at']}"
+                for sheet, entry in snapshot.manifest["sheets"].items()
+            )
         )
-        (
-            self.df_arch_mat_auth,
-            self.df_arch_mat_search,
-            self.arch_mat_mapping_dict,
-            self.arch_mat_search_dict,
-        ) = order_archival_material(df_arch_mat_auth)
-        self.df_arch_mat_mapping = df_arch_mat_mapping
-        self.df_creator_corps_role = df_creator_corps_role
-        self.df_creator_pers_role = df_creator_pers_role
-        self.df_cataloguers = df_catalogers
-        self.cataloger_name_mapper = cataloger_name_mapper
-        self.df_countries = df_countries
-        self.df_languages = df_languages
-        self.roles_dict = roles_dict
-        self.df_level = df_level
-        self.df_credits = order_credits(df_credits)
-        self.df_privacy_values = df_privacy_values
-        self.privacy_mapping_dict = privacy_mapping_dict
-        self.privacy_search_dict = privacy_search_dict
-        self.mapper_655_to_999 = mapper_655_to_999
+        return snapshot
+
+    authority = Authority(offline=args.offline or None, refresh=args.refresh)
+    authority.load_worksheets()
+    return authority
 
 
 if __name__ != "__main__":
-    Authority_instance = Authority()
+    Authority_instance = LazyAuthority()
 
 if __name__ == "__main__":
-    Authority_instance = Authority()
+    Authority_instance = main()
@@ -4,7 +4,11 @@ import os
 import shutil
 import sys
 import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from hashlib import sha1
 from pathlib import Path
 from shutil import copyfile
 
@@ -12,8 +16,9 @@ import gspread
 import numpy as np
 import pandas as pd
 from alphabet_detector import AlphabetDetector
+from gspread.utils import numericise_all
 from oauth2client.service_account import ServiceAccountCredentials
-from pymarc import XMLWriter, Record, Field
+from pymarc import Record, Field, record_to_xml_node
 
 from . import columns
 from .AuthorityFiles import Authority_instance
@@ -25,6 +30,9 @@ from .files import (
 )
 from .files import get_google_drive_api_path
 from .project import get_branch_colletionID
+from .snapshot import SnapshotStore, get_modified_time
+
+CATALOG_CACHE_PATH = Path.cwd() / "data" / "catalog_cache"
 
 
 def retrieve_collection():
@@ -96,32 +104,201 @@ def choose_catalog_gspread(client, collection_id):
     return client, files[int(file_index)]["id"], files[int(file_index)]["name"]
 
 
-# TODO change this function to take only the relevant sheets and not all of them
-def create_xl_from_gspread(client: gspread.client.Client, file_id: str) -> dict:
+def records_from_values(values, head=1):
+    """
+    builds the records of a sheet from its raw values, the same way gspread's Worksheet.get_all_records does:
+    the rows are padded to the width of the widest row, and the cell values are numericised.
+
+    :param values: the list of rows (lists of cell values) of the sheet, as returned by the Sheets API
+    :param head: the row (starting from 1) to use as the keys of the records
+    :return: a list of dictionaries, one for each row below the head row
+    """
+    idx = head - 1
+    if len(values) <= idx:
+        return []
+    width = max(len(row) for row in values)
+    values = [row + [""] * (width - len(row)) for row in values]
+    keys = values[idx]
+    return [dict(zip(keys, numericise_all(row))) for row in values[idx + 1 :]]
+
+
+def select_catalog_sheets(titles):
+    """
+    :param titles: the titles of all the sheets of the catalog spreadsheet
+    :return: the titles of the sheets the pipeline uses - the catalog sheets (Collection.catalog_sheets),
+        the works sheets (יצירות) and the final catalog sheet (קטלוג סופי)
+    """
+    catalog_sheets = set(Collection.catalog_sheets().values())
+    return [
+        title
+        for title in titles
+        if title in catalog_sheets or "יצירות" in title or title == "קטלוג סופי"
+    ]
+
+
+def create_xl_from_gspread(
+        client: gspread.client.Client, file_id: str, mode: str = "batch"
+) -> dict:
     """
-    the function opens the Google Sheet spreadsheet and  iterates over all the sheets within the file, creates a
-    dataframe from each sheet and adds it to a dictionary of dataframes.
+    the function opens the Google Sheet spreadsheet, creates a dataframe from each sheet and adds it to a
+    dictionary of dataframes.
 
     :param client: the google drive/sheets client api created by the creadentials in the
         'google_drive_api/client_secret.json' file.
     :param file_id: the file id of the google spreadsheet to parse
+    :param mode: "batch" (default) - fetch only the sheets the pipeline uses (see select_catalog_sheets),
+        all in a single batched values request.
+        "all" - fetch every sheet of the spreadsheet, two requests per sheet.
     :return: a dictionary dataframes - each dataframe represents a sheet within the google spreadsheet.
     """
     spreadsheet = client.open_by_key(file_id)
     all_sheets_as_dfs = {}
     worksheet_list = spreadsheet.worksheets()
 
-    for sheet in worksheet_list:
-        print(sheet)
-        if sheet.row_values(2) is None:
-            continue
-        dict_ds = sheet.get_all_records(head=1)
-        df = pd.DataFrame(dict_ds)
-        all_sheets_as_dfs[sheet.title] = df
+    if mode == "all":
+        for sheet in worksheet_list:
+            print(sheet)
+            if sheet.row_values(2) is None:
+                continue
+            dict_ds = sheet.get_all_records(head=1)
+            df = pd.DataFrame(dict_ds)
+            all_sheets_as_dfs[sheet.title] = df
+
+        return all_sheets_as_dfs
+
+    assert mode == "batch", f"unknown fetch mode {mode}"
+    titles = select_catalog_sheets([sheet.title for sheet in worksheet_list])
+    logger = logging.getLogger(__name__)
+    logger.info(f"[GSPREAD] Fetching sheets {titles} in a single batch request")
+
+    response = spreadsheet.values_batch_get(
+        ["'" + title.replace("'", "''") + "'" for title in titles]
+    )
+    for title, value_range in zip(titles, response["valueRanges"]):
+        all_sheets_as_dfs[title] = pd.DataFrame(
+            records_from_values(value_range.get("values", []), head=1)
+        )
 
     return all_sheets_as_dfs
 
 
+def catalog_cache_key(file_id: str, modified_time: str) -> str:
+    """
+    :return: the key of a version of a catalog spreadsheet in the catalog cache
+    """
+    return sha1(f"{file_id}:{modified_time}".encode("utf8")).hexdigest()[:16]
+
+
+def is_complete_catalog(store) -> bool:
+    """
+    :param store: the SnapshotStore of a cached version of a catalog spreadsheet
+    :return: True if the version was saved, with all of its sheets
+    """
+    sheets = list(store.manifest["sheets"])
+    return len(sheets) > 0 and store.has_sheets(sheets)
+
+
+def latest_cached_catalog(cache_path, file_id: str):
+    """
+    :param cache_path: the directory of the catalog cache
+    :param file_id: the file id of the google spreadsheet
+    :return: the SnapshotStore of the latest complete cached version of the spreadsheet, None if there
+        is no such version
+    """
+    if not cache_path.is_dir():
+        return None
+    stores = [
+        SnapshotStore(path, file_id) for path in cache_path.iterdir() if path.is_dir()
+    ]
+    stores = [
+        store
+        for store in stores
+        if store.manifest["modified_time"] is not None and is_complete_catalog(store)
+    ]
+    if len(stores) == 0:
+        return None
+    return max(stores, key=lambda store: store.manifest["modified_time"])
+
+
+def fetch_catalog(
+        client: gspread.client.Client, file_id: str, cache_path=None
+) -> dict:
+    """
+    returns the sheets of the catalog spreadsheet (see create_xl_from_gspread), from the catalog cache if
+    this version of the spreadsheet was already downloaded.
+
+    The cache is content addressed - every version of a spreadsheet (its file id and Drive modifiedTime)
+    is kept in its own snapshot directory, and older versions of the same spreadsheet are removed when a
+    new version is downloaded. Drive reports modifiedTime only for the whole file, so a modified
+    spreadsheet is downloaded again in full (a single batched request). If the modifiedTime cannot be
+    retrieved, the latest cached version of the spreadsheet is used (if there is one).
+
+    :param client: the google drive/sheets client api
+    :param file_id: the file id of the google spreadsheet to parse
+    :param cache_path: the directory of the catalog cache (default: CATALOG_CACHE_PATH)
+    :return: a dictionary dataframes - each dataframe represents a sheet within the google spreadsheet.
+    """
+    logger = logging.getLogger(__name__)
+    cache_path = Path(CATALOG_CACHE_PATH if cache_path is None else cache_path)
+
+    modified_time = get_modified_time(client, file_id)
+    if modified_time is None:
+        store = latest_cached_catalog(cache_path, file_id)
+        if store is None:
+            logger.warning(
+                f"[CACHE] No modifiedTime for {file_id} and no cached version, "
+                f"downloading it without the catalog cache"
+            )
+            return create_xl_from_gspread(client, file_id)
+        logger.warning(
+            f"[CACHE] No modifiedTime for {file_id}, loading the cached version "
+            f"(modified {store.manifest['modified_time']})"
+        )
+        return {sheet: store.load_sheet(sheet) for sheet in store.manifest["sheets"]}
+
+    store = SnapshotStore(
+        cache_path / catalog_cache_key(file_id, modified_time), file_id
+    )
+    if is_complete_catalog(store):
+        logger.info(f"[CACHE] Loading {file_id} (modified {modified_time}) from the cache")
+        return {sheet: store.load_sheet(sheet) for sheet in store.manifest["sheets"]}
+
+    dfs = create_xl_from_gspread(client, file_id)
+
+    # remove the older versions of the spreadsheet
+    if cache_path.is_dir():
+        for path in cache_path.iterdir():
+            old_store = SnapshotStore(path, file_id)
+            if path != store.path and old_store.manifest["modified_time"] is not None:
+                old_store.clear()
+
+    store.save_sheets(dfs, modified_time)
+    return dfs
+
+
+def read_catalog_file(path) -> dict:
+    """
+    reads a local copy of a catalog spreadsheet into a dictionary of dataframes. Empty cells are read as
+    empty strings, as they are when the catalog is read from Google Sheets.
+
+    :param path: a workbook (.xlsx or .csv), or a directory of per-sheet files (<sheet name>.csv)
+    :return: a dictionary dataframes - each dataframe represents a sheet within the catalog.
+    """
+    path = Path(path)
+    if path.is_dir():
+        all_sheets_as_dfs = {}
+        for file in sorted(path.iterdir()):
+            if file.suffix == ".csv":
+                all_sheets_as_dfs[file.stem] = pd.read_csv(file, keep_default_na=False)
+        return all_sheets_as_dfs
+
+    if path.suffix == ".csv":
+        return {"קטלוג": pd.read_csv(path, keep_default_na=False)}
+
+    assert path.suffix in (".xlsx", ".xls"), f"unsupported catalog file {path}"
+    return pd.read_excel(path, sheet_name=None, keep_default_na=False, na_values=[])
+
+
 def export_entire_catalog(collection, df_sheets_dict, stage):
     if stage == "PRE_FINAL":
         file_path = collection.data_path_raw / (
@@ -319,6 +496,221 @@ def find_last_updated_gspread(client, collection_id):
     )
 
 
+MarcColumn = namedtuple("MarcColumn", ["name", "tag", "indicators", "code", "kind"])
+
+
+def parse_marc_column(col: str) -> MarcColumn:
+    """
+    parses the name of a column of the MARC table into the MARC field it holds. Repeated fields are
+    suffixed with "_<n>" (for example "650 7_1").
+
+    :param col: the column name: LDR, a 3 digit tag, optionally followed by 2 indicators
+    :return: a MarcColumn - the tag, the indicators, the 5 character field code (tag + indicators)
+        and the kind of the field: leader, control (008) or data
+    """
+    if col.find("_") == -1:
+        code = "{:<5}".format(col)
+    else:
+        code = "{:<5}".format(col[: col.find("_")])
+
+    if col == "LDR":
+        kind = "leader"
+    elif col == "008":
+        kind = "control"
+    else:
+        kind = "data"
+
+    return MarcColumn(col, col[:3], [code[3], code[4]], code, kind)
+
+
+def marc_subfields(value: str) -> list:
+    """
+    :param value: the value of a MARC field in the $$<code><data> format, for example: $$aTitle$$bSubtitle
+    :return: the flat list of subfield codes and data pymarc expects: ["a", "Title", "b", "Subtitle"]
+    """
+    subfields_data = list()
+    for subfield in filter(None, value.split("$$")):
+        subfields_data.append(subfield[0])
+        subfields_data.append(subfield[1:])
+    return subfields_data
+
+
+MARCXML_HEADER = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<collection xmlns="http://www.loc.gov/MARC21/slim">'
+)
+MARCXML_FOOTER = b"</collection>"
+
+MARC_FORMATS = ("xml", "seq")
+MARC_FILE_SUFFIXES = {"xml": ".xml", "seq": ".txt", "mrc": ".mrc"}
+
+
+def iter_marc_rows(df):
+    """
+    iterates over the MARC table, one row at a time.
+
+    :param df: the MARC table - a column for every MARC field (see parse_marc_column), indexed by the record id
+    :return: a generator of (index, fields) tuples - the fields are the (MarcColumn, value) pairs of the
+        non-empty cells of the row, in the order of the columns.
+    """
+    # the column metadata is the same for all the rows - parse it once
+    marc_columns = [parse_marc_column(col) for col in df.columns]
+    columns_values = [df[col].tolist() for col in df.columns]
+    # if field is empty, skip
+    not_empty = np.column_stack(
+        [(df[col].astype(str) != "").to_numpy() for col in df.columns]
+    ).reshape(len(df), len(df.columns))
+
+    for row_position, index in enumerate(df.index):
+        yield index, [
+            (marc_columns[position], columns_values[position][row_position])
+            for position in np.flatnonzero(not_empty[row_position])
+        ]
+
+
+def create_marc_record(index, fields, subfields_cache=None) -> Record:
+    """
+    :param index: the record id
+    :param fields: the (MarcColumn, value) pairs of the record (see iter_marc_rows)
+    :param subfields_cache: a dictionary of the subfield lists already parsed, by value
+    :return: the record as a pymarc Record
+    """
+    if subfields_cache is None:
+        subfields_cache = {}
+
+    record = Record()
+
+    # add control field
+    record.add_field(Field(tag="001", data=str(index)))
+
+    for marc_column, value in fields:
+        # leader
+        if marc_column.kind == "leader":
+            l = record.leader
+            l.record_status = "c"  # c - Corrected or revised
+            l.type_of_record = "p"  # p - Mixed materials
+
+            # Bibliographic level - the original check
+            # (row["351"] == "File Record" or "Item Record") was always true
+            l.bibliographic_level = "c"
+
+            l.coding_scheme = "a"  # flag saying this record is utf8
+            l.cataloging_form = "a"
+            continue
+
+        # 008
+        elif marc_column.kind == "control":
+            record.add_field(Field(tag="008", data=value))
+            continue
+
+        # extract sub-fields
+        value = str(value)
+        if value not in subfields_cache:
+            subfields_cache[value] = marc_subfields(value)
+
+        record.add_field(
+            Field(
+                tag=marc_column.tag,
+                indicators=marc_column.indicators,
+                subfields=subfields_cache[value],
+            )
+        )
+
+    return record
+
+
+def create_marc_seq_lines(index, fields, leader) -> str:
+    """
+    :param index: the record id
+    :param fields: the (MarcColumn, value) pairs of the record (see iter_marc_rows)
+    :param leader: the value of the LDR column of the record
+    :return: the lines of the record in the Aleph sequential format
+    """
+    lines = [f"{index} LDR   {leader}\n", f"{index} 001   {index}\n"]
+    for marc_column, value in fields:
+        if marc_column.kind == "leader":
+            continue
+
+        # construct the line for the MARC sequantial file
+        line = f"{index} {marc_column.code} {str(value)}\n"
+        line = line.replace("$$$$", "$$")
+        line = line.replace("$$a$$a", "$$")
+        lines.append(line)
+
+    return "".join(lines)
+
+
+def serialize_marc_table(df, formats=MARC_FORMATS, timings=None):
+    """
+    serializes the MARC table one record at a time, in all the requested formats in the same pass.
+
+    :param df: the MARC table (see iter_marc_rows)
+    :param formats: the output formats: xml (MARCXML record element), seq (Aleph sequential lines),
+        mrc (binary MARC21 - ISO 2709)
+    :param timings: a dictionary to which the time spent on each format (and on building the pymarc
+        records - "record") is added, in seconds
+    :return: a generator of dictionaries, one for each record, of format -> the serialized record (bytes)
+    """
+    leaders = df["LDR"].tolist() if "seq" in formats else None
+    subfields_cache = {}
+    if timings is None:
+        timings = {}
+    for key in ("record",) + tuple(formats):
+        timings.setdefault(key, 0.0)
+
+    for row_position, (index, fields) in enumerate(iter_marc_rows(df)):
+        serialized = {}
+        if "xml" in formats or "mrc" in formats:
+            start_time = time.perf_counter()
+            record = create_marc_record(index, fields, subfields_cache)
+            timings["record"] += time.perf_counter() - start_time
+        if "xml" in formats:
+            start_time = time.perf_counter()
+            serialized["xml"] = ET.tostring(
+                record_to_xml_node(record), encoding="utf-8"
+            )
+            timings["xml"] += time.perf_counter() - start_time
+        if "seq" in formats:
+            start_time = time.perf_counter()
+            serialized["seq"] = create_marc_seq_lines(
+                index, fields, leaders[row_position]
+            ).encode("utf8")
+            timings["seq"] += time.perf_counter() - start_time
+        if "mrc" in formats:
+            start_time = time.perf_counter()
+            # the values are in Hebrew - always encode the binary record in utf8
+            record.force_utf8 = True
+            serialized["mrc"] = record.as_marc()
+            timings["mrc"] += time.perf_counter() - start_time
+        yield serialized
+
+
+def serialize_marc_shard(df, formats=MARC_FORMATS) -> dict:
+    """
+    serializes a shard (a slice of rows) of the MARC table - run in the worker processes of a
+    parallel export.
+
+    :param df: the shard of the MARC table (see iter_marc_rows)
+    :param formats: the output formats (see serialize_marc_table)
+    :return: a dictionary of format -> the serialized records of the shard, in order (bytes)
+    """
+    fragments = {format: [] for format in formats}
+    for serialized in serialize_marc_table(df, formats):
+        for format, data in serialized.items():
+            fragments[format].append(data)
+    return {format: b"".join(data) for format, data in fragments.items()}
+
+
+def split_to_shards(df, shards: int) -> list:
+    """
+    :param df: a dataframe
+    :param shards: the number of shards
+    :return: a list of consecutive slices of rows of the dataframe, in order
+    """
+    bounds = np.linspace(0, len(df), min(shards, max(len(df), 1)) + 1).astype(int)
+    return [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
 class Collection:
     _project_branches = ["Architect", "Dance", "Design", "Theater"]
     _catalog_sheets = {
@@ -588,25 +980,100 @@ class Collection:
         )
         write_excel(dataframe2export, preprocess_filename, "Catalog")
 
-    def __init__(self, CMS: str, branch: str, collection_id: str, manual=True):
+    def __init__(
+            self,
+            CMS: str,
+            branch: str,
+            collection_id: str,
+            manual=True,
+            base_path=None,
+    ):
         """
              Initializer / Instance Attributes
         :param CMS: To which CMS the collection is intended to be imported to
         :param branch: The name of the project branch the collection belongs to (Architect , Design, Dance, Theater)
         :param collection_id: The collection identifier (call number)
+        :param base_path: the directory in which the branch directories are created
+            (default: the project directory on Google Drive)
+        """
+        self.init_directories(CMS, branch, collection_id, base_path)
+
+        # set up logger for collection instance
+        logger = logging.getLogger(__name__)
+
+        if manual:
+            (
+                client,
+                self.google_sheet_file_id,
+                self.google_sheet_file_name,
+            ) = choose_catalog_gspread(connect_to_google_drive(), self.collection_id)
+        else:
+            (
+                client,
+                self.google_sheet_file_id,
+                self.google_sheet_file_name,
+            ) = find_last_updated_gspread(
+                connect_to_google_drive(), self.set_collection_id()
+            )
+
+        logger.info("Creating ")
+
+        self.dfs = fetch_catalog(client, self.google_sheet_file_id)
+        export_entire_catalog(self, self.dfs, stage="PRE_FINAL")
+
+        self.init_tables(self.dfs)
+
+        # turn headers to English
+        logger.info(f"Creating Excel: Saving file ")
+        export_entire_catalog(self, self.dfs, stage="PRE1_FINAL")
+        self.create_catalog_metadata_file()
+
+    @classmethod
+    def from_file(
+            cls,
+            path,
+            branch: str,
+            collection_id: str,
+            CMS: str = "alma",
+            base_path=None,
+            df_credits=None,
+    ):
+        """
+            Alternative constructor - creates the collection from a local copy of the catalog, without
+            connecting to Google Drive.
+        :param path: a workbook (.xlsx or .csv), or a directory of per-sheet files (<sheet name>.csv)
+        :param branch: The name of the project branch the collection belongs to (Architect , Design, Dance, Theater)
+        :param collection_id: The collection identifier (call number)
+        :param CMS: To which CMS the collection is intended to be imported to (default: alma)
+        :param base_path: the directory in which the branch directories are created
+            (default: the project directory on Google Drive)
+        :param df_credits: the credits table (default: the credits table of the Authority files)
+        :return: the Collection instance
         """
+        collection = cls.__new__(cls)
+        collection.init_directories(CMS, branch, collection_id, base_path)
+        collection.google_sheet_file_id = None
+        collection.google_sheet_file_name = Path(path).name
+
+        collection.dfs = read_catalog_file(path)
+        collection.init_tables(collection.dfs, df_credits)
+        collection.create_catalog_metadata_file()
+        return collection
 
+    def init_directories(self, CMS, branch, collection_id, base_path=None):
+        """
+            sets the identifiers of the collection, and creates its directory with all folders and sub-folders.
+        """
         self.cms = CMS
         self.branch = branch
         self.collection_id = collection_id
         self.dt_now = datetime.now().strftime("%Y%m%d")
 
+        if base_path is None:
+            base_path = Path("C:/Users/Yaelg/Google Drive/National_Library/Python")
+
         # create directory and sub-folders for collection
-        self.BASE_PATH = (
-                Path("C:/Users/Yaelg/Google Drive/National_Library/Python")
-                / (branch)
-                / collection_id
-        )
+        self.BASE_PATH = Path(base_path) / (branch) / collection_id
 
         # initialize directory with all folder and sub-folders for the collection
         (
@@ -644,48 +1111,34 @@ class Collection:
             self.aleph_custom04_path,
         )
 
-        # set up logger for collection instance
-        logger = logging.getLogger(__name__)
-
-        if manual:
-            (
-                client,
-                self.google_sheet_file_id,
-                self.google_sheet_file_name,
-            ) = choose_catalog_gspread(connect_to_google_drive(), self.collection_id)
-        else:
-            (
-                client,
-                self.google_sheet_file_id,
-                self.google_sheet_file_name,
-            ) = find_last_updated_gspread(
-                connect_to_google_drive(), self.set_collection_id()
-            )
-
-        logger.info("Creating ")
-
-        self.dfs = create_xl_from_gspread(client, self.google_sheet_file_id)
-        export_entire_catalog(self, self.dfs, stage="PRE_FINAL")
-
-        self.df_catalog = remove_instructions_row(remove_empty_rows(self.dfs["קטלוג"]))
+    def init_tables(self, dfs, df_credits=None):
+        """
+            creates the tables of the collection (df_catalog, df_collection, df_personalities, df_corporation,
+            df_works, full_catalog and df_final_data) from the sheets of the catalog.
+        :param dfs: a dictionary of dataframes - one for each sheet of the catalog
+        :param df_credits: the credits table (default: the credits table of the Authority files)
+        """
+        self.df_catalog = remove_instructions_row(remove_empty_rows(dfs["קטלוג"]))
         self.df_collection = remove_instructions_row(
-            remove_empty_rows(self.dfs["אוסף"])
+            remove_empty_rows(dfs["אוסף"])
         )
 
         if self.branch != "REI":
             self.df_collection = add_current_owner(
-                self.df_collection, Authority_instance.df_credits, self.collection_id
+                self.df_collection,
+                Authority_instance.df_credits if df_credits is None else df_credits,
+                self.collection_id,
             )
             self.df_personalities = remove_instructions_row(
-                remove_empty_rows(self.dfs["אישים"])
+                remove_empty_rows(dfs["אישים"])
             )
             self.df_corporation = remove_instructions_row(
-                remove_empty_rows(self.dfs["מוסדות"])
+                remove_empty_rows(dfs["מוסדות"])
             )
             try:
                 if self.branch != "VC-Design" and self.branch != "Design":
-                    work_col = [x for x in self.dfs.keys() if "יצירות" in x][0]
-                    self.df_works = self.dfs[work_col]
+                    work_col = [x for x in dfs.keys() if "יצירות" in x][0]
+                    self.df_works = dfs[work_col]
             except:
                 pass
 
@@ -697,12 +1150,12 @@ class Collection:
             if name[:2] != "__" and name[-2:] != "__"
         ]
 
-        if "קטלוג סופי" in self.dfs.keys():
+        if "קטלוג סופי" in dfs.keys():
             # if inspect.stack()[1] == "preprocess_1":
             #     breakpoint
 
             self.df_final_data = remove_unnamed_cols(
-                self.dfs["קטלוג סופי"].rename(
+                dfs["קטלוג סופי"].rename(
                     columns={"Unnamed: 1": "סימול", "": "mms_id"}
                 )
             )
@@ -710,115 +1163,96 @@ class Collection:
                 "\n".join(
                     [
                         f"{i} :{col}"
-                        for col, i in enumerate(self.dfs["קטלוג סופי"].columns)
+                        for col, i in enumerate(dfs["קטלוג סופי"].columns)
                     ]
                 )
             )
-            # print(f'column of קטלוג סופי are: {[index, col for (index, col) in enumrate(self.dfs.columns)]}'
+            # print(f'column of קטלוג סופי are: {[index, col for (index, col) in enumrate(dfs.columns)]}'
             self.df_final_data.rename(
                 columns={self.df_final_data.columns[0]: "mms_id"}, inplace=True
             )
             self.df_final_data = self.df_final_data.set_index("mms_id")
 
-        # turn headers to English
-        logger.info(f"Creating Excel: Saving file ")
-        export_entire_catalog(self, self.dfs, stage="PRE1_FINAL")
-        self.create_catalog_metadata_file()
-
-    def create_MARC_XML(self):
+    def marc_file_path(self, format):
         """
-        Creates a MARC XML format file from the given dataframe
-        :return:
+        :param format: the output format: xml, seq, mrc
+        :return: the path of the final MARC file of the collection in the given format
         """
-        df = self.marc_data
-        #  MARCXML file
-        output_file = self.data_path_processed / (
-                self.collection_id + "_final_" + self.dt_now + ".xml"
+        return self.data_path_processed / (
+                self.collection_id + "_final_" + self.dt_now + MARC_FILE_SUFFIXES[format]
         )
-        writer = XMLWriter(open(output_file, "wb"))
-
-        # MarcEdit MRK file
-        output_file_mrk = self.data_path_processed / (
-                self.collection_id + "_finalMRK_" + self.dt_now + ".txt"
-        )
-        mrk_file = open(output_file_mrk, "w", encoding="utf8")
 
+    def create_marc_files(self, formats=MARC_FORMATS, buffer_size=2 ** 20, workers=1):
+        """
+        Creates the final MARC files of the collection from the MARC table (self.marc_data), in a single
+        pass over the table - one record is serialized at a time and written to all the files through
+        buffered file handles.
+
+        With more than one worker, the table is split into shards of consecutive rows which are
+        serialized in parallel processes. The shards are written in the order of the table, so the
+        files are identical to the files of a single process export.
+        :param formats: the output formats: xml (MARC XML), seq (MARC sequential file for Aleph),
+            mrc (binary MARC21 - ISO 2709)
+        :param buffer_size: the size of the write buffer of each file, in bytes
+        :param workers: the number of worker processes (default 1 - serialize in this process)
+        :return: the number of records written + 1, and the run time in seconds
+        """
+        logger = logging.getLogger(__name__)
+        df = self.marc_data
         start_time = time.time()
         counter = 1
+        timings = {}
 
-        for index, row in df.iterrows():
-
-            record = Record()
-
-            # add control field
-            record.add_field(Field(tag="001", data=str(index)))
-
-            for col in df:
-                # if field is empty, skip
-                if str(row[col]) == "":
-                    continue
-                # leader
-                elif col == "LDR":
-                    l = record.leader
-                    l.record_status = "c"  # c - Corrected or revised
-                    l.type_of_record = "p"  # p - Mixed materials
-
-                    # Bibliographic level
-                    if row["351"] == "File Record" or "Item Record":
-                        l.bibliographic_level = "c"
-                    else:
-                        l.bibliographic_level = "d"
-
-                    l.coding_scheme = "a"  # flag saying this record is utf8
-                    l.cataloging_form = "a"
-                    continue
-
-                # 008
-                elif col == "008":
-                    field = Field(tag="008", data=row[col])
-                    record.add_field(field)
-                    continue
-
-                # extract field name
-                field = col[:3]
-
-                # extract indicators
-                if col.find("_") == -1:
-                    col_name = "{:<5}".format(col)
-                    ind = [col_name[3], col_name[4]]
-                else:
-                    col_name = "{:<5}".format(col[: col.find("_")])
-                    ind = [col_name[3], col_name[4]]
-
-                # extract sub-fields
-                subfields_data = list()
-                subfields_prep = list(filter(None, str(row[col]).split("$$")))
-                for subfield in subfields_prep:
-                    if subfield == "":
-                        continue
-                    subfields_data.append(subfield[0])
-                    subfields_data.append(subfield[1:])
-
-                # print('field:', field)
-                # if not ind:
-                #     print('no indicators')
-                # else:
-                #     print('indicators:', ind)
-                # # print('subfields:', subfields_data)
-
-                record.add_field(
-                    Field(tag=field, indicators=ind, subfields=subfields_data)
-                )
+        files = {
+            format: open(self.marc_file_path(format), "wb", buffering=buffer_size)
+            for format in formats
+        }
+        try:
+            if "xml" in files:
+                files["xml"].write(MARCXML_HEADER)
+
+            if workers > 1:
+                # a few shards per worker, to balance the load between the workers
+                shards = split_to_shards(df, workers * 4)
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    fragments = executor.map(
+                        serialize_marc_shard, shards, [formats] * len(shards)
+                    )
+                    for shard, serialized in zip(shards, fragments):
+                        for format, data in serialized.items():
+                            files[format].write(data)
+                        counter += len(shard)
+            else:
+                for serialized in serialize_marc_table(df, formats, timings):
+                    for format, data in serialized.items():
+                        files[format].write(data)
+                    counter += 1
+
+            if "xml" in files:
+                files["xml"].write(MARCXML_FOOTER)
+        finally:
+            for f in files.values():
+                f.close()
 
-            counter += 1
-            # mrk_file.write(record.as_marc())
-            writer.write(record)
-        writer.close()
-        mrk_file.close()
         run_time = time.time() - start_time
 
+        for format in formats:
+            timing = f", {timings[format]:.2f} seconds" if format in timings else ""
+            logger.info(
+                f"[MARC] {format}: {self.marc_file_path(format).stat().st_size} bytes written{timing}"
+            )
+        if timings.get("record"):
+            logger.info(f"[MARC] building the records: {timings['record']:.2f} seconds")
+
         return counter, run_time
 
+    def create_MARC_XML(self):
+        """
+        Creates a MARC XML format file from the given dataframe
+        :return:
+        """
+        return self.create_marc_files(formats=("xml",))
+
     def create_marc_seq_file(self):
         """
         function to transform a MARC formatted Dataframe into a MARC sequantial file
@@ -828,45 +1262,7 @@ class Collection:
         logger.info(
             f"[MARC Sequantial] Creating MARC sequantial file for {self.collection_id}"
         )
-
-        df = self.marc_data
-        ad = AlphabetDetector()
-        output_file_name = self.data_path_processed / (
-                self.collection_id + "_final_" + self.dt_now + ".txt"
-        )
-
-        with open(output_file_name, "w", encoding="utf8") as f:
-            for index, row in df.iterrows():
-
-                f.write(f"{index} LDR   {row['LDR']}\n")
-                f.write(f"{index} 001   {index}\n")
-
-                for col in df:
-                    # if field is empty, skip
-                    if str(row[col]) == "" or col == "LDR":
-                        continue
-
-                    # # check language
-                    # lang = ad.detect_alphabet(str(row[col]))
-                    # if "HEBREW" in lang:
-                    #     lang = "H"
-                    # else:
-                    #     lang = "L"
-
-                    # construct 5 character field code
-                    if "_" in col:
-                        col_name = "{:<5}".format(col[: col.find("_")])
-                    else:
-                        col_name = "{:<5}".format(col)
-
-                    # construct the line for the MARC sequantial file
-                    line = f"{index} {col_name} {str(row[col])}\n"
-                    # if col_name == '035':
-                    line = line.replace("$$$$", "$$")
-                    line = line.replace("$$a$$a", "$$")
-
-                    # write to file
-                    f.write(line)
+        self.create_marc_files(formats=("seq",))
 
     def set_branch(self):
         while True:
@@ -1,13 +1,13 @@
-import difflib
+import json
 import logging
 import os
 import pprint
 import sys
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from functools import lru_cache
 
 import pandas as pd
-from fuzzywuzzy import process
-
+from alphabet_detector import AlphabetDetector
 from VC_collections import Collection
 from VC_collections.AuthorityFiles import *
 from VC_collections.columns import (
@@ -18,54 +18,93 @@ from VC_collections.columns import (
     replace_NaN,
 )
 from VC_collections.files import write_excel
+from VC_collections.matcher import (
+    VocabularyMatcher,
+    sequence_ratio,
+    split_exact_hits,
+)
+from VC_collections.multivalue import MultiValueColumn
 from VC_collections.value import clean_name
 
 logger = logging.getLogger(__name__)
 
+# the number of distinct creator strings kept in the cache of parse_creator
+CREATOR_CACHE_SIZE = 2 ** 16
+
+ParsedCreator = namedtuple("ParsedCreator", ["name", "role", "lang"])
 
-def split_creators_by_type(df, col_name):
+_alphabet_detector = AlphabetDetector()
+
+
+def split_creators_by_type(df, col_name, roles_dict=None):
     """
     take the col name of the col that contains multiple creators (corps+pers) and split them in to\
     2 different columns take the add_creators column and split it in to add_pers and add_corp according to the role.
-    if the role is in the corps role, and if the role in in the pers role list
+    if the role is in the corps role, and if the role in in the pers role list (a role which is in both
+    lists is added to both columns)
 
     :param df: The original Dataframe
     :param col_name:  the column name which contains the creators
+    :param roles_dict: the lists of roles by kind - pers_roles, corps_roles
+        (default: Authority_instance.roles_dict)
     :return: df: the modified dataframe with two new columns - creators_pers and creators corps
-    @param mode:
     """
+    if roles_dict is None:
+        roles_dict = Authority_instance.roles_dict
+    pers_roles = set()
+    corps_roles = set()
+    for k, v in roles_dict.items():
+        if "pers" in k:
+            pers_roles.update(v)
+        else:
+            corps_roles.update(v)
 
-    for index, row in df.iterrows():
-        add_pers_creators = []
-        add_corps_creators = []
-        for creator in str(row[col_name]).split(";"):
-            for k, v in Authority_instance.roles_dict.items():
-                if find_role(creator) in v:
-                    if "pers" in k:
-                        add_pers_creators.append(creator)
-                    else:
-                        add_corps_creators.append(creator)
-        if "CREATOR_" in df.columns.values:
-            if str(row["CREATOR_PERS"]) != "":
-                add_pers_creators.append(
-                    str(row["CREATOR_PERS"]).strip()
-                    + " ["
-                    + str(row["CREATOR_PERS_ROLE"]).strip()
-                    + "]"
-                )
-            if str(row["CREATOR_CORP"]) != "":
-                add_corps_creators.append(
-                    str(row["CREATOR_CORP"]).strip()
-                    + " ["
-                    + str(row["CREATOR_CORP_ROLE"]).strip()
-                    + "]"
-                )
+    # one row for each creator, indexed by the position of the row in df
+    creators = (
+        pd.Series(df[col_name].astype(str).tolist(), dtype=object)
+        .str.split(";")
+        .explode()
+    )
+    creators = creators[creators != ""]
+    roles = creators.map({creator: find_role(creator) for creator in creators.unique()})
+
+    def join_creators(mask):
+        # sum of "creator;" strings per row - much faster than a python join per group
+        return (
+            (creators[mask] + ";")
+            .groupby(level=0, sort=False)
+            .sum()
+            .str[:-1]
+            .reindex(range(len(df)), fill_value="")
+        )
+
+    add_pers_creators = join_creators(roles.isin(pers_roles))
+    add_corps_creators = join_creators(roles.isin(corps_roles))
 
-        add_pers_creators = list(filter(None, add_pers_creators))
-        add_corps_creators = list(filter(None, add_corps_creators))
+    if "CREATOR_" in df.columns.values:
 
-        df.loc[index, "COMBINED_CREATORS_PERS"] = ";".join(add_pers_creators)
-        df.loc[index, "COMBINED_CREATORS_CORPS"] = ";".join(add_corps_creators)
+        def append_creator(creators_col, name_col, role_col):
+            names = pd.Series(df[name_col].astype(str).tolist(), dtype=object)
+            new_creators = (
+                names.str.strip()
+                + " ["
+                + pd.Series(df[role_col].astype(str).tolist()).str.strip()
+                + "]"
+            ).where(names != "", "")
+            separator = pd.Series(";", index=names.index).where(
+                (creators_col != "") & (new_creators != ""), ""
+            )
+            return creators_col + separator + new_creators
+
+        add_pers_creators = append_creator(
+            add_pers_creators, "CREATOR_PERS", "CREATOR_PERS_ROLE"
+        )
+        add_corps_creators = append_creator(
+            add_corps_creators, "CREATOR_CORP", "CREATOR_CORP_ROLE"
+        )
+
+    df["COMBINED_CREATORS_PERS"] = add_pers_creators.to_numpy()
+    df["COMBINED_CREATORS_CORPS"] = add_corps_creators.to_numpy()
 
     if "COMBINED_CREATORS" in df.columns.values:
         df.COMBINED_CREATORS = df.COMBINED_CREATORS.str.strip()
@@ -192,10 +231,12 @@ def create_match_file(collection, df_authority_file, df_auth, column):
     if column == "MEDIUM_FORMAT":
         choices = df_authority_file["MEDIA_FORMAT"].tolist()
 
-    # fuzzy matching process
-    for value in df_auth.index:
+    # fuzzy matching process - only for the values which are not exact vocabulary terms
+    matcher = VocabularyMatcher(choices)
+    _, unknown_values = split_exact_hits(df_auth.index, matcher.terms, column)
+    for value in unknown_values:
 
-        match_results[value] = process.extract(value, choices, limit=4)
+        match_results[value] = matcher.extract(value, limit=4)
 
     new_match_results = dict()
     for key, value in match_results.items():
@@ -260,6 +301,32 @@ def is_pers(creator, df_pers_roles):
         return False
 
 
+def creator_kinds(creator, relator_index=None):
+    """
+        Looks up the role of the creator in the relator index of the Authority files
+    :param creator: the creator (including role in brackets)
+    :param relator_index: the relator index to look up (default: Authority_instance.relator_index)
+    :return: a dictionary of the kinds of the role (PERS / CORPS) -> the relators of the role,
+        empty if the role is unknown
+    """
+    if relator_index is None:
+        relator_index = Authority_instance.relator_index
+    return relator_index.get(parse_creator(creator).role, {})
+
+
+def lookup_relator(relators, lang):
+    """
+        Map role to RDA Relator - same as map_role_to_relator, using the relator index
+    :param relators: the relators of the role (see creator_kinds)
+    :param lang: the language of the role
+    :return: the relator in the language of the role, None if the language is not Hebrew or Latin
+    """
+    if lang == "heb":
+        return relators["RELATOR_HEB"]
+    if lang == "lat" or lang == "eng":
+        return relators["RELATOR_ENG"]
+
+
 def find_role(name):
     """
     from a given name string value returns only the name.
@@ -302,6 +369,63 @@ def find_name(name):
         return clean_name(name.rstrip())
 
 
+def find_name_lang(name):
+    """
+        Finds the language of a name, by its alphabet - if there is more than one alphabet, or none,
+        the default is Hebrew.
+    :param name: the name (without role)
+    :return: the language code: heb, lat, cyr, ara, etc.
+    """
+    alphabets = _alphabet_detector.detect_alphabet(name)
+    if len(alphabets) != 1:
+        return "heb"
+    return alphabets.pop()[:3].lower()
+
+
+@lru_cache(maxsize=CREATOR_CACHE_SIZE)
+def parse_creator(creator):
+    """
+        Parses a creator string once - the result is kept in a bounded LRU cache, so every distinct
+        creator string is parsed only once (statistics in parse_creator.cache_info()). The parsing does
+        not depend on the Authority files - the kinds and relator of the role are looked up separately
+        (see creator_kinds and creator_relator).
+        Ex. אפרתי משה [צלם] returns ParsedCreator(name="אפרתי משה", role="צלם", lang="heb")
+    :param creator: the value of the a creator with a role
+    :return: a ParsedCreator - the name, the role and the language of the name
+    """
+    name = find_name(creator)
+    return ParsedCreator(name, find_role(creator), find_name_lang(name))
+
+
+def creator_relator(creator, lang=None, relator_index=None):
+    """
+        Maps the role of a creator to its RDA relator, by the first kind (PERS / CORPS) of the role.
+    :param creator: the creator (including role in brackets)
+    :param lang: the language of the relator (default: the language of the name of the creator)
+    :param relator_index: the relator index to look up (default: Authority_instance.relator_index)
+    :return: the relator, None if the role is unknown or there is no relator in the language
+    """
+    kinds = creator_kinds(creator, relator_index)
+    if not kinds:
+        return None
+    if lang is None:
+        lang = parse_creator(creator).lang
+    return lookup_relator(next(iter(kinds.values())), lang)
+
+
+def log_creator_cache_info():
+    """
+        Logs the hit/miss statistics of the creator strings cache (parse_creator)
+    :return: the cache info of parse_creator
+    """
+    cache_info = parse_creator.cache_info()
+    logger.info(
+        f"[CREATORS] creator strings cache: {cache_info.hits} hits, {cache_info.misses} misses, "
+        f"{cache_info.currsize} distinct creators"
+    )
+    return cache_info
+
+
 def create_combined_creators(row):
     if row["FIRST_CREATOR_PERS"] != "":
         first_creator = (
@@ -374,22 +498,14 @@ def unique_creators(df):
     :param df:
     :return:
     """
-    characters_to_filter = [None, np.nan, " "]
-    for index, frame in df.iterrows():
-        l1 = str(frame["COMBINED_CREATORS"]).split(";")
-        creator_names = set([find_name(x) for x in l1])
-
-        new_persnames = str(frame["PERSNAME"]).split(";")
-        new_persnames = list(filter(None, new_persnames))
-        if len(new_persnames) > 0:
-            new_persnames = [x for x in new_persnames if x not in creator_names]
+    creator_names = MultiValueColumn.from_series(
+        df["COMBINED_CREATORS"].astype(str)
+    ).map(lambda x: parse_creator(x).name)
 
-        new_corpsnames = list(filter(None, str(frame["CORPNAME"]).split(";")))
-        if len(new_corpsnames) > 0:
-            new_corpsnames = [x for x in new_corpsnames if x not in creator_names]
-
-        df.loc[index, "PERSNAME"] = ";".join(new_persnames)
-        df.loc[index, "CORPNAME"] = ";".join(new_corpsnames)
+    for col in ["PERSNAME", "CORPNAME"]:
+        names = MultiValueColumn.from_series(df[col].astype(str))
+        names = names.filter(lambda x: x != "")
+        df[col] = names.filter(~names.in_row(creator_names)).render(";").to_numpy()
 
     return df
 
@@ -421,7 +537,7 @@ def map_relators(df, authority_role_list):
     indexes_roles_not_found = []
     for index, row in df.iterrows():
         for creator in str(row["COMBINED_CREATORS"]).strip().split(";"):
-            temp_role = find_role(creator)
+            temp_role = parse_creator(creator).role
             roles.append(temp_role)
             if temp_role.strip() not in authority_role_list:
                 indexes_roles_not_found.append((temp_role, index))
@@ -463,6 +579,8 @@ def correct_relators(
     :param temp_role_dict:
     """
 
+    matcher = VocabularyMatcher(authority_role_list)
+
     def create_error_report():
         """
 
@@ -470,7 +588,7 @@ def correct_relators(
         res = [
             (role,) + item
             for role in role_not_found
-            for item in process.extract(role, authority_role_list, limit=5)
+            for item in matcher.extract(role, limit=5)
         ]
         df_roles = pd.DataFrame(res, columns=["role", "match", "match score"])
         df_indexes_roles_not_found = pd.DataFrame.from_dict(
@@ -502,7 +620,7 @@ def correct_relators(
                 "[ROLES] Printing roles that are not found - and the options for corrections"
             )
             pprint.pprint(str(role))
-            pprint.pprint(process.extract(str(role), authority_role_list))
+            pprint.pprint(matcher.extract(str(role)))
         pprint.pprint(set(role_not_found))
         create_error_report()
 
@@ -554,6 +672,7 @@ def clean_creators(collection: Collection) -> Collection:
 
     df["COMBINED_CREATORS"] = df["COMBINED_CREATORS"].str.replace(";;", ";")
     collection.full_catalog = df
+    log_creator_cache_info()
 
     return collection
 
@@ -571,16 +690,40 @@ def convert_dict(new_val2errs):
     return d
 
 
-def find_new_value(err, error_words2possible_new_vals):
-    try:
-        close_match4err = difflib.get_close_matches(
-            err, list(error_words2possible_new_vals.keys()), n=1, cutoff=0.6
-        )[0]
-    except IndexError:
-        return None
+def correction_candidates(err, error_words2possible_new_vals, matcher, cutoff=60):
+    """
+        finds the possible new values of an error word, by the closest known error word.
+    :param err: the error word
+    :param error_words2possible_new_vals: the mapping of known error words -> possible new values
+    :param matcher: a VocabularyMatcher of the known error words
+    :param cutoff: the minimal similarity (0-100) of the closest known error word
+    :return: the similarity of the closest known error word (None if there is none), and its distinct
+        possible new values
+    """
+    best = matcher.close_match(err, cutoff)
+    if best is None:
+        return None, []
+    close_match4err, score = best
+    return score, list(dict.fromkeys(error_words2possible_new_vals[close_match4err]))
 
-    possible_new_vals = error_words2possible_new_vals[close_match4err]
-    if len(possible_new_vals) == 1 or possible_new_vals[0] == possible_new_vals[1]:
+
+def find_new_value(err, error_words2possible_new_vals, matcher=None):
+    """
+        finds the new value of an error word, by the closest known error word. If there are several
+        possible new values, the user is asked to choose one.
+    :param err: the error word
+    :param error_words2possible_new_vals: the mapping of known error words -> possible new values
+    :param matcher: a VocabularyMatcher of the known error words (built if not given)
+    :return: the new value, or None if no close error word was found
+    """
+    if matcher is None:
+        matcher = error_words_matcher(error_words2possible_new_vals)
+    score, possible_new_vals = correction_candidates(
+        err, error_words2possible_new_vals, matcher
+    )
+    if score is None:
+        return None
+    if len(possible_new_vals) == 1:
         return possible_new_vals[0]
 
     print("\n".join([f"{i} :{pnv}" for pnv, i in enumerate(possible_new_vals)]))
@@ -599,49 +742,145 @@ def find_new_value(err, error_words2possible_new_vals):
     return None if new_val_i == -1 else possible_new_vals[new_val_i]
 
 
-def fix_values_in_column(col, err, new_val):
-    if new_val is not None:
-        if new_val != err:
-
-            col = col.apply(lambda x: x.split(";"))
-            try:
-                for index, line in col.items():
-                    for i, val in enumerate(line):
-                        if val == err:
-                            line[i] = new_val
-                    col.at[index] = line
-            except:
-                print(
-                    f"Bad error value: [{err}], please correct in original data, and run again."
-                )
+def error_words_matcher(error_words2possible_new_vals):
+    """
+    :param error_words2possible_new_vals: the mapping of known error words -> possible new values
+    :return: a VocabularyMatcher of the known error words, scored as difflib.get_close_matches
+    """
+    return VocabularyMatcher(
+        error_words2possible_new_vals.keys(), scorer=sequence_ratio, normalizer=str
+    )
 
-            col = col.apply(lambda x: ";".join(x))
-        return None, col
-    return err, col
+
+def apply_corrections(col, corrections):
+    """
+        replaces all the corrected values of a column in a single pass.
+    :param col: the column of ; delimited values
+    :param corrections: the mapping of error word -> new value
+    :return: the fixed column
+    """
+    corrections = {err: new_val for err, new_val in corrections.items() if err != new_val}
+    if len(corrections) == 0:
+        return col
+    return MultiValueColumn.from_series(col).map(corrections).render(";")
 
 
 def fix_original(col, error_words, new_values):
+    """
+        finds the new value of every error word, and replaces all of them in the column in one pass.
+    :param col: the column of ; delimited values
+    :param error_words: the values to check
+    :param new_values: the mapping of new values -> error words
+    :return: the list of error words with no new value, and the fixed column
+    """
     error_words2possible_new_val = convert_dict(new_values)
+    matcher = error_words_matcher(error_words2possible_new_val)
     missing_errs = []
+    replacements = {}
     for err in error_words:
         if len(err) > 0:
-            ret, col = fix_values_in_column(
-                col, err, find_new_value(err, error_words2possible_new_val)
-            )
-            if ret is not None:
-                missing_errs.append(ret)
-    return missing_errs, col
+            new_val = find_new_value(err, error_words2possible_new_val, matcher)
+            if new_val is None:
+                missing_errs.append(err)
+            else:
+                replacements[err] = new_val
+
+    return missing_errs, apply_corrections(col, replacements)
 
 
-def check_values_against_cvoc(df, col_name, new_values):
+def decide_corrections(error_words, new_values, decisions=None, threshold=60):
+    """
+        decides the new value of every error word up front, without asking the user: an error word
+        which has a decision gets its decided value, otherwise it gets the single possible new value of
+        the closest known error word - if the similarity is at least the threshold.
+    :param error_words: the values to check
+    :param new_values: the mapping of new values -> error words
+    :param decisions: a mapping of error word -> new value, decided in advance. An empty new value
+        leaves the error word unresolved.
+    :param threshold: the minimal similarity (0-100) for an automatic correction
+    :return: the mapping of error word -> new value, and the mapping of the unresolved error words ->
+        their possible new values
+    """
+    decisions = decisions or {}
+    error_words2possible_new_val = convert_dict(new_values)
+    matcher = error_words_matcher(error_words2possible_new_val)
+    corrections, unresolved = {}, {}
+    for err in error_words:
+        if len(err) == 0:
+            continue
+        if err in decisions:
+            if decisions[err]:
+                corrections[err] = decisions[err]
+            else:
+                unresolved[err] = []
+            continue
+        score, possible_new_vals = correction_candidates(
+            err, error_words2possible_new_val, matcher, cutoff=threshold
+        )
+        if score is not None and len(possible_new_vals) == 1:
+            corrections[err] = possible_new_vals[0]
+        else:
+            unresolved[err] = possible_new_vals
+    return corrections, unresolved
+
+
+def read_correction_decisions(path):
+    """
+        reads a decisions file of the batch correction mode. A JSON file holds a dictionary of
+        column -> {error word -> new value}, a CSV or Excel file has the columns COLUMN, ERROR and
+        CORRECTION.
+    :param path: the path of the decisions file
+    :return: the dictionary of column -> {error word -> new value}
+    """
+    if str(path).lower().endswith(".json"):
+        with open(path, encoding="utf8") as f:
+            return json.load(f)
+    if str(path).lower().endswith(".csv"):
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    else:
+        df = pd.read_excel(path, dtype=str, keep_default_na=False)
+    decisions = defaultdict(dict)
+    for column, err, new_val in zip(df["COLUMN"], df["ERROR"], df["CORRECTION"]):
+        decisions[column][err] = new_val
+    return dict(decisions)
+
+
+def check_values_against_cvoc(df, col_name, new_values, decisions=None, threshold=None):
+    """
+        checks the values of a column against a controlled vocabulary and corrects the error words.
+        By default the user is asked to choose between the possible new values of an error word; if
+        decisions or a threshold are given, the corrections are decided up front without asking
+        (batch mode) and the unresolved error words are only reported.
+    :param df: the DataFrame
+    :param col_name: the name of the column of ; delimited values
+    :param new_values: the mapping of new values -> error words
+    :param decisions: batch mode - a mapping of error word -> new value, decided in advance
+    :param threshold: batch mode - the minimal similarity (0-100) for an automatic correction
+        (default: 60)
+    :return: the DataFrame with the corrected column
+    """
     logger = logging.getLogger(__name__)
-    test_list = [x.split(";") for x in df[col_name].tolist()]
-    vals_to_check = [item for sublist in test_list for item in sublist]
-    vals_to_check = list(set(vals_to_check))
+    vals_to_check = MultiValueColumn.from_series(df[col_name]).unique()
+
+    if decisions is None and threshold is None:
+        values_not_found, df[col_name] = fix_original(
+            df[col_name], vals_to_check, new_values
+        )
+    else:
+        corrections, unresolved = decide_corrections(
+            vals_to_check,
+            new_values,
+            decisions,
+            threshold=60 if threshold is None else threshold,
+        )
+        df[col_name] = apply_corrections(df[col_name], corrections)
+        values_not_found = list(unresolved)
+        for err, possible_new_vals in unresolved.items():
+            logger.warning(
+                f"[{col_name.upper()}] No correction decided for [{err}], "
+                f"possible new values: {possible_new_vals}"
+            )
 
-    values_not_found, df[col_name] = fix_original(
-        df[col_name], vals_to_check, new_values
-    )
     if len(values_not_found) > 0:
         print(
             f"Total of {len(vals_to_check) - len(values_not_found)} were fixed."
@@ -1,11 +1,10 @@
-import collections
 import logging
-import pprint
 
 import numpy as np
 import pandas as pd
 
 from .fieldmapper import field_types_dict
+from .multivalue import MultiValueColumn
 
 
 def column_exists(df, col):
@@ -22,47 +21,41 @@ def more_than_one_value_in_cell(df, col_name) -> bool:
     return df[col_name].str.contains(";").any()
 
 
-def remove_duplicate_in_column(df, col):
+def remove_duplicate_in_column(df, col, report=False):
     """
-    check for duplicate values for each row in a Column 'col' of a dataframe 'df'
+    check for duplicate values for each row in a Column 'col' of a dataframe 'df'.
+    The first appearance of every value in a cell is kept, in the original order of the values.
     :param df: the dataframe to check
     :param col: the column in which to search form duplicate values
-    :return: the duplicate free dataframe
+    :param report: return also a report of the duplicates found
+    :return: the duplicate free dataframe, and if report is True - a dataframe of the duplicate values
+        found in each cell (columns: column, duplicates), indexed by the index of the cell
     """
-    logger = logging.Logger(__name__)
+    logger = logging.getLogger(__name__)
+    df_report = pd.DataFrame(columns=["column", "duplicates"])
     if col not in list(df.columns):
-        return df
-    for index, frame in df[col].iteritems():
-
-        # if there is a list of values delimited by ;
-        if ";" in str(frame):
-            old_values_list = frame.split(";")
-            # check if there are duplicate values
-            #             print('len old:', len(old_values_list), 'len new:',len(set(old_values_list)))
-            if len(old_values_list) > len(set(old_values_list)):
-                logger.info(f"[{col}] Removing duplicates in {col} field. ")
-
-                print("There are duplicates in column {}, index {}".format(col, index))
-                pprint.pprint(
-                    [
-                        item
-                        for item, count in collections.Counter(old_values_list).items()
-                        if count > 1
-                    ]
-                )
-                new_values_list = ";".join(list(set(old_values_list)))
-
-            else:
-                new_values_list = ";".join(old_values_list)
-
-        # if there is only 1 value
-        else:
-            new_values_list = frame
-
-        # update the column with the new list of unique values per cell
-        df.loc[index, col] = new_values_list
+        return (df, df_report) if report else df
 
-    return df
+    # only cells with a list of values delimited by ; can have duplicates
+    multi_value = df[col].astype(str).str.contains(";", regex=False).to_numpy()
+    values = MultiValueColumn.from_series(df.loc[multi_value, col])
+    duplicated = values.duplicated()
+
+    if duplicated.any():
+        duplicates = values.filter(duplicated).dedupe()
+        has_duplicates = duplicates.lengths > 0
+        logger.info(
+            f"[{col}] Removing duplicates in {col} field - "
+            f"{has_duplicates.sum()} cells with duplicate values."
+        )
+        df.loc[multi_value, col] = values.filter(~duplicated).render(";").to_numpy()
+
+        df_report = pd.DataFrame(
+            {"column": col, "duplicates": duplicates.render(";").to_numpy()},
+            index=values.index,
+        )[has_duplicates]
+
+    return (df, df_report) if report else df
 
 
 def dupCheck(df, column_name):
@@ -0,0 +1,215 @@
+"""
+Normalization of catalog dates.
+
+Catalog dates are written in many formats ("29-09-2010", "1994-7", "12/03/1950 10:00" ...) and the same
+dates repeat heavily within a catalog. A DateNormalizer classifies every raw date by its shape (its
+digits replaced by 9, e.g. "99-99-9999"), tries only the formats which can match that shape - in the
+order of its format list, so the result is the same as trying all of them - and memoizes the result of
+every raw date. Whole columns are normalized once per distinct value, and the dates which could not be
+parsed are collected into a report instead of stopping the run.
+"""
+import logging
+import re
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# the shapes of the values each strptime directive accepts (digits replaced by 9)
+DIRECTIVE_SHAPES = {
+    "Y": "9999",
+    "y": "99",
+    "m": "(?:99|9)",
+    "d": "(?:99|9| 9)",
+    "H": "(?:99|9)",
+    "M": "(?:99|9)",
+    "S": "(?:99|9)",
+}
+
+# the formats of full dates, in order of precedence
+FULL_DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%d-%m",
+    "%Y-%m-%d %H:%M",
+    "%d-%m-%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M:%S",
+    "%Y%m%d %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%y %H:%M",
+]
+
+# the formats of dates of a month
+MONTH_DATE_FORMATS = ["%Y-%m", "%m-%Y", "%m/%Y", "%Y/%m"]
+
+YEAR_DATE_FORMATS = ["%Y"]
+
+# the formats of the cataloguing date (תאריך הרישום) of the 921/933 fields
+CATALOGUING_DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m",
+    "%Y-%m-%d %H:%M",
+    "%d-%m-%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M:%S",
+    "%Y%m%d %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%y %H:%M",
+]
+
+
+def date_shape(value):
+    """
+    :param value: a raw date string
+    :return: the shape of the date - its digits replaced by 9
+    """
+    return re.sub(r"\d", "9", value)
+
+
+def format_shape_pattern(date_format):
+    """
+    :param date_format: a strptime format
+    :return: a compiled regular expression which matches the shapes of all the dates the format can
+        parse
+    """
+    pattern = ""
+    for directive, literal in re.findall(r"%(.)|(.)", date_format, flags=re.S):
+        if directive:
+            pattern += DIRECTIVE_SHAPES[directive]
+        elif literal.isspace():
+            pattern += r"\s+"
+        else:
+            pattern += re.escape(literal)
+    return re.compile(pattern)
+
+
+class DateNormalizer:
+    """
+    Parses raw dates with an ordered list of strptime formats, and formats them in a single output format.
+    """
+
+    def __init__(self, formats, output_format):
+        """
+        :param formats: the strptime formats of the raw dates, in order of precedence
+        :param output_format: the strftime format of the normalized dates
+        """
+        self.formats = list(dict.fromkeys(formats))
+        self.output_format = output_format
+        self.patterns = [format_shape_pattern(f) for f in self.formats]
+        self._shapes = dict()
+        self._results = dict()
+
+    def candidate_formats(self, value):
+        """
+        :param value: a raw date string
+        :return: the formats which can match the shape of the date, in order of precedence
+        """
+        shape = date_shape(value)
+        if shape not in self._shapes:
+            self._shapes[shape] = [
+                date_format
+                for date_format, pattern in zip(self.formats, self.patterns)
+                if pattern.fullmatch(shape)
+            ]
+        return self._shapes[shape]
+
+    def normalize(self, value):
+        """
+        :param value: a raw date string
+        :return: the normalized date, or None if none of the formats matches the date
+        """
+        if value not in self._results:
+            result = None
+            for date_format in self.candidate_formats(value):
+                try:
+                    result = datetime.strptime(value, date_format).strftime(
+                        self.output_format
+                    )
+                    break
+                except ValueError:
+                    continue
+            self._results[value] = result
+        return self._results[value]
+
+
+YEAR_DATES = DateNormalizer(YEAR_DATE_FORMATS, "%Y")
+MONTH_DATES = DateNormalizer(MONTH_DATE_FORMATS, "%Y-%m")
+FULL_DATES = DateNormalizer(FULL_DATE_FORMATS, "%Y-%m-%d")
+CATALOGUING_DATES = DateNormalizer(CATALOGUING_DATE_FORMATS, "%Y%m")
+
+
+def normalize_date(string_date):
+    """
+    normalizes a catalog date by its length: up to 4 characters is a year (YYYY), 6-7 characters is a
+    month (YYYY-MM), anything else is a full date (YYYY-MM-DD).
+    :param string_date: the raw date
+    :return: the normalized date, or None if its format is not known
+    """
+    string_date_clean = str(string_date).strip()
+    if len(string_date_clean) < 5:
+        return YEAR_DATES.normalize(string_date_clean)
+    if 6 <= len(string_date_clean) < 8:
+        return MONTH_DATES.normalize(string_date_clean)
+    return FULL_DATES.normalize(string_date_clean)
+
+
+def normalize_series(series, normalizer):
+    """
+    applies a normalization function once for every distinct value of a column.
+    :param series: the column of raw values
+    :param normalizer: a function raw value -> normalized value (None for a failure)
+    :return: the column of normalized values (None for failures), and the list of distinct values which
+        failed
+    """
+    mapping = {value: normalizer(value) for value in pd.unique(series)}
+    failures = [value for value, result in mapping.items() if result is None]
+    return series.map(mapping), failures
+
+
+def clean_date_column(series):
+    """
+    normalizes a column of catalog dates (see normalize_date). The dates which could not be normalized
+    are kept as they are, and reported together.
+    :param series: the column of raw dates
+    :return: the column of normalized dates, and the list of dates which could not be normalized
+    """
+    normalized, failures = normalize_series(series, normalize_date)
+    if len(failures) > 0:
+        logger.error(f"[DATES] didn't find the right date format for {failures}")
+        sys.stderr.write(
+            f"Please clean these dates: {failures}\n And re-run application\n\n"
+        )
+        normalized = normalized.where(normalized.notnull(), series)
+    return normalized, failures
+
+
+def date_failures_report(series, failures):
+    """
+    :param series: the column of raw dates
+    :param failures: the dates which could not be normalized (see clean_date_column)
+    :return: a dataframe of the records whose date could not be normalized (columns: column, date),
+        indexed by the index of their record
+    """
+    failed = series[series.isin(failures)]
+    return pd.DataFrame({"column": series.name, "date": failed}, index=failed.index)
+
+
+def cataloguing_month_column(series):
+    """
+    converts a column of cataloguing dates to the YYYYMM format of the 921/933 fields.
+    :param series: the column of cataloguing dates
+    :return: the column of YYYYMM dates
+    """
+    months, failures = normalize_series(
+        series, lambda value: CATALOGUING_DATES.normalize(str(value))
+    )
+    if len(failures) > 0:
+        logger.error(f"[921/933] didn't find the right date format for {failures}")
+        sys.exit()
+    return months
@@ -27,6 +27,7 @@ import pandas as pd
 
 from VC_collections.authorities import find_name, find_role
 from VC_collections.columns import drop_col_if_exists
+from VC_collections.multivalue import MultiValueColumn
 
 
 def splitDataFrameList(df, target_column, separator):
@@ -62,11 +63,7 @@ def explode_col_to_new_df(df, col, sep=";", start=0):
     :param start:
     :return:
     """
-    df_explode = (
-        df[col]
-        .str.split(sep, expand=True)
-        .rename(columns=lambda x: col + f"_{start+x+1}")
-    )
+    df_explode = MultiValueColumn.from_series(df[col], sep).to_columns(col, start)
     df = pd.concat([df, df_explode], axis=1)
     df = df.fillna("")
     df = drop_col_if_exists(df, col)
@@ -0,0 +1,165 @@
+"""
+Fixed-width MARC 008 control fields.
+
+The 008 field is a fixed-length string whose character positions have a defined meaning (in the
+FIELD_008_TEMPLATE of this repository, positions 18-20 are the country of publication - the "xx#"
+placeholder - and 35-37 the language). A Field008 keeps the 008 fields of a whole table as a matrix of
+bytes - one row per record, one column per character position - so a stage can patch a range of
+positions for all the records at once, and the fields are rendered back to strings when the stage is
+done.
+
+A record whose 008 field is not a valid fixed-width ascii string, or whose patched value cannot be
+written, is reported in the log and left as it is - a single bad record does not stop the stage.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+FIELD_008_TEMPLATE = "######k###########xx######################d"
+
+# the character which marks an empty position of the 008 field
+FILL_CHARACTER = "#"
+
+# character positions (start, end) of the 008 elements patched by the MARC stages
+COUNTRY_POSITIONS = (18, 21)
+LANGUAGE_POSITIONS = (35, 38)
+
+logger = logging.getLogger(__name__)
+
+
+def is_valid_008(field, width):
+    return isinstance(field, str) and len(field) == width and field.isascii()
+
+
+class Field008:
+    """
+    The 008 fields of a table, as a (records x positions) matrix of ascii bytes.
+    """
+
+    def __init__(self, matrix, index=None, name="008", originals=None):
+        """
+        :param matrix: a two dimensional uint8 array - one row per record
+        :param index: the index of the records (default: a RangeIndex)
+        :param name: the name of the column
+        :param originals: the original values of the records which are not valid 008 fields, by row
+            position - these rows are never patched, and are rendered back as they were
+        """
+        self.matrix = matrix
+        self.index = pd.RangeIndex(len(matrix)) if index is None else index
+        self.name = name
+        self.originals = dict() if originals is None else originals
+
+    @classmethod
+    def from_series(cls, series, width=len(FIELD_008_TEMPLATE)):
+        """
+        :param series: a column of 008 fields
+        :param width: the length of the 008 fields (default: the length of FIELD_008_TEMPLATE)
+        :return: the Field008 of the column. Fields which are not ascii strings of the given width are
+            reported, and kept as they are.
+        """
+        fields = series.tolist()
+        originals = {
+            position: field
+            for position, field in enumerate(fields)
+            if not is_valid_008(field, width)
+        }
+        if originals:
+            logger.error(
+                f"[008] {len(originals)} records have an invalid 008 field and are left as they "
+                f"are, e.g. {list(series.index[list(originals)[:5]])}"
+            )
+            placeholder = FILL_CHARACTER * width
+            fields = [
+                placeholder if position in originals else field
+                for position, field in enumerate(fields)
+            ]
+        fields = np.array(
+            [field.encode("ascii") for field in fields], dtype=f"S{width}"
+        )
+        matrix = fields.view(np.uint8).reshape(len(fields), width).copy()
+        return cls(matrix, series.index, series.name, originals)
+
+    @classmethod
+    def from_template(cls, index, template=FIELD_008_TEMPLATE):
+        """
+        :param index: the index of the records
+        :param template: the initial 008 field of every record
+        :return: a Field008 with the template for every record
+        """
+        row = np.frombuffer(template.encode("ascii"), dtype=np.uint8)
+        return cls(np.tile(row, (len(index), 1)), index)
+
+    @property
+    def width(self):
+        return self.matrix.shape[1]
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def patch(self, start, values, rows=None, width=None):
+        """
+        writes values into the positions start, start + 1, ... of the 008 fields. Every value is cut or
+        padded (with FILL_CHARACTER) to the width, so it never spills over the next element. Values
+        which are not ascii are reported, and their rows are left as they are.
+        :param start: the first position to write
+        :param values: a single string written to all the rows, or a sequence of strings (one per
+            patched row)
+        :param rows: a boolean array of the rows to patch (default: all the rows)
+        :param width: the number of positions to write (default: the length of the longest value)
+        :return: the Field008 itself
+        """
+        if rows is None:
+            rows = np.ones(len(self), dtype=bool)
+        positions = np.flatnonzero(np.asarray(rows, dtype=bool))
+        if isinstance(values, str):
+            values = [values] * len(positions)
+        values = [str(value) for value in values]
+        if len(values) != len(positions):
+            raise ValueError(
+                f"[008] {len(values)} values for the {len(positions)} patched rows"
+            )
+        if len(values) == 0:
+            return self
+        if width is None:
+            width = max(len(value) for value in values)
+
+        values = [value[:width].ljust(width, FILL_CHARACTER) for value in values]
+        valid = np.array(
+            [
+                value.isascii() and position not in self.originals
+                for position, value in zip(positions.tolist(), values)
+            ],
+            dtype=bool,
+        )
+        rejected = [
+            (self.index[position], value)
+            for position, value, ok in zip(positions.tolist(), values, valid)
+            if not ok and position not in self.originals
+        ]
+        if rejected:
+            logger.error(
+                f"[008] {len(rejected)} values for positions {start}-{start + width - 1} are not "
+                f"ascii and were not written, e.g. {rejected[:5]}"
+            )
+        if not valid.any():
+            return self
+
+        encoded = np.array(
+            [value.encode("ascii") for value, ok in zip(values, valid) if ok],
+            dtype=f"S{width}",
+        )
+        self.matrix[positions[valid], start : start + width] = encoded.view(
+            np.uint8
+        ).reshape(int(valid.sum()), width)
+        return self
+
+    def to_series(self):
+        """
+        :return: the 008 fields as a column of strings, with the index of the records
+        """
+        fields = np.ascontiguousarray(self.matrix).view(f"S{self.width}").ravel()
+        fields = np.char.decode(fields, "ascii").astype(object)
+        for position, original in self.originals.items():
+            fields[position] = original
+        return pd.Series(fields, index=self.index, name=self.name)
@@ -10,31 +10,42 @@ from fuzzywuzzy import process
 from xml.dom import minidom
 
 from VC_collections.AuthorityFiles import *
-from VC_collections.authorities import is_corp, is_pers, find_name, find_role
-from VC_collections.authorities import map_role_to_relator
+from VC_collections.authorities import find_name, find_role
+from VC_collections.authorities import creator_kinds, creator_relator, parse_creator
 from VC_collections.columns import (
     drop_col_if_exists,
     column_exists,
     remove_duplicate_in_column,
 )
+from VC_collections.dates import (
+    CATALOGUING_DATES,
+    cataloguing_month_column,
+    clean_date_column,
+    date_failures_report,
+)
 from VC_collections.explode import explode_col_to_new_df
+from VC_collections.field008 import (
+    COUNTRY_POSITIONS,
+    FIELD_008_TEMPLATE,
+    FILL_CHARACTER,
+    LANGUAGE_POSITIONS,
+    Field008,
+)
+from VC_collections.matcher import split_exact_hits
+from VC_collections.multivalue import MultiValueColumn
 from VC_collections.project import get_root_index_and_title, lookup_rosetta_file
 from VC_collections.value import (
     clean_text,
     find_nth,
-    replace_lst_dict,
     is_multi_value,
-    clean_date_format,
 )
 
 # ROOTID finder
 ROOTID_finder = lambda x: x[: find_nth(x, "-", x.count("-"))] if "-" in x else ""
 
-Authority_instance = Authority()
-
 
 def create_MARC_initial_008(df):
-    df["008"] = "######k###########xx######################d"
+    df["008"] = FIELD_008_TEMPLATE
     return df
 
 
@@ -390,29 +401,20 @@ def all_rest_creators(x):
 
 
 def add_MARC_role(val, lang):
-    role = find_role(val)
+    creator = parse_creator(val)
+    role = creator.role
 
     if role != "":
-        if is_pers(val, Authority_instance.df_creator_pers_role):
-            role = map_role_to_relator(
-                find_role(val), Authority_instance.df_creator_pers_role, lang
-            )
-        elif is_corp(val, Authority_instance.df_creator_corps_role):
-            role = map_role_to_relator(
-                find_role(val),
-                Authority_instance.df_creator_corps_role,
-                lang,
-                mode="CORPS",
-            )
-        else:
-            print("role not found: ", find_role(val))
+        role = creator_relator(val, lang)
+        if not creator_kinds(val):
+            print("role not found: ", creator.role)
             role = ""
 
     if role == "" or role is None:
-        val = "$$a" + find_name(val) + "$$9" + lang
+        val = "$$a" + creator.name + "$$9" + lang
 
     else:
-        val = "$$a" + find_name(val) + "$$9" + lang + "$$e" + role
+        val = "$$a" + creator.name + "$$9" + lang + "$$e" + role
 
     if val == "$$a$$9heb":
         return ""
@@ -431,8 +433,6 @@ def name_lang_check(val, mode="PERS"):
     :type val: string
     """
 
-    ad = alphabet_detector.AlphabetDetector()
-
     val = str(val)
     val = val.strip()
 
@@ -440,12 +440,7 @@ def name_lang_check(val, mode="PERS"):
         return ""
 
     # find alphabet - if there is more that one default it's hebrew
-    if len(ad.detect_alphabet(find_name(val))) > 1:
-        lang = "heb"
-    elif len(ad.detect_alphabet(find_name(val))) < 1:
-        lang = "heb"
-    else:
-        lang = ad.detect_alphabet(find_name(val)).pop()[:3].lower()
+    lang = parse_creator(val).lang
 
     if mode == "PERS" or mode == "CORPS":
         val = add_MARC_role(val, lang)
@@ -476,8 +471,9 @@ def aleph_creators(df, col_name, mode="PERS"):
             creators = row[col_name].split(";")
         else:
             creators = [str(row[col_name])]
+        first_creator_name = parse_creator(creators[0]).name
         for creator in creators:
-            if find_name(creators[0]) == "לא ידוע" or find_name(creators[0]) == "ריבוי":
+            if first_creator_name == "לא ידוע" or first_creator_name == "ריבוי":
                 continue
             else:
                 new_creators.append(creator)
@@ -491,11 +487,12 @@ def aleph_creators(df, col_name, mode="PERS"):
 
 def remove_first_creator_from_700(df):
     for index, row in df.iterrows():
-        if is_corp(row["יוצר_ראשון"], Authority_instance.df_creator_corps_role):
+        kinds = creator_kinds(row["יוצר_ראשון"])
+        if "CORPS" in kinds:
             df.loc[index, "יוצרים מוסדות"] = row["יוצרים מוסדות"].replace(
                 row["יוצר_ראשון"], ""
             )
-        if is_pers(row["יוצר_ראשון"], Authority_instance.df_creator_pers_role):
+        if "PERS" in kinds:
             df.loc[index, "יוצרים אישים"] = row["יוצרים אישים"].replace(
                 row["יוצר_ראשון"], ""
             )
@@ -623,9 +620,10 @@ def create_MARC_100_110(df):
 
     # check if first creator is a person or a corporate body
     for index, row in df["יוצר_ראשון"].iteritems():
-        if is_corp(row, Authority_instance.df_creator_corps_role):
+        kinds = creator_kinds(row)
+        if "CORPS" in kinds:
             df.loc[index, "1102"] = row
-        elif is_pers(row, Authority_instance.df_creator_pers_role):
+        elif "PERS" in kinds:
             df.loc[index, "1001"] = row
 
     df = df.replace(np.nan, "")
@@ -813,16 +811,11 @@ def check_values_arch_mat(df, arch_mat_col, arch_mat_mapping_dict):
     new_arch = list(set(new_arch.split(";")))
     new_arch = list(filter(None, new_arch))  # fastest
 
-    error_values = list()
-
-    for item in new_arch:
-        best, score = process.extractOne(item, list(arch_mat_mapping_dict.keys()))
-        #     print(item, 'best choice:', best, item == best)
-        if best == item:
-            continue
-        else:
-            error_values.append(item)
-    #             raise Exception("{} is not in archival material controlled vocabulary".format(item))
+    # only an exact vocabulary term is a valid value - the best fuzzy match of any other value is a
+    # different term, so the unknown values are the error values without scoring them at all
+    _, error_values = split_exact_hits(
+        new_arch, set(arch_mat_mapping_dict.keys()), arch_mat_col
+    )
     return error_values
 
 
@@ -845,12 +838,20 @@ def create_MARC_default_copyright(df):
     return df
 
 
-def create_MARC_999_values_list(lst_655_7: list) -> list:
-    lst_999 = []
-    for term in lst_655_7:
-        if term in Authority_instance.mapper_655_to_999.keys():
-            lst_999.append("$$a" + Authority_instance.mapper_655_to_999[term])
-    return list(set(lst_999))
+def find_broader_term(term):
+    """
+        extracts the broader term of an archival material term - the text in the parentheses, as in
+        "מפה (תשריט)".
+    :param term: the archival material term
+    :return: the broader term, or None if the term has no broader term
+    """
+    if ")" not in term:
+        return None
+    broader_terms = re.findall(r"\((.*)\)", term)
+    if len(broader_terms) == 0:
+        sys.stderr.write(f"[Error] There is a problem with 655 term: {term}")
+        return None
+    return broader_terms[0].strip()
 
 
 def create_MARC_655(df):
@@ -888,36 +889,22 @@ def create_MARC_655(df):
     else:
         arch_mat_col = process.extractOne(col, list(df.columns))[0]
 
-        for index, row in df.iterrows():
-            lst_655_7 = row[arch_mat_col].split(";")
-            # print(index, '\n', 'before:', lst_655_7)
-            lst_655_7 = list(map(str.strip, lst_655_7))
-            broader_terms = list()
-            final = list()
-
-            # make list of broader ARCHIVAL_MATERIAL terms
-            for term in lst_655_7:
-                if ")" in term:
-                    try:
-
-                        broader_terms.append(re.findall(r"\((.*)\)", term)[0])
-                    except:
-                        sys.stderr.write(
-                            f"[Error] There is a problem with 655 term: {term}"
-                        )
-            for term in broader_terms:
-                final.append(term.strip())
-            final = list(set(final))
-            lst_655_7 = lst_655_7 + final
-            list_999 = create_MARC_999_values_list(lst_655_7)
-            df.loc[index, "999"] = ";".join(list_999)
-            # print("before: ", lst_655_7)
-            lst_655_7 = replace_lst_dict(
-                lst_655_7, Authority_instance.arch_mat_mapping_dict
-            )
-            # print("after:", lst_655_7)
-
-            df.loc[index, "655 7"] = ";".join(lst_655_7)
+        # the terms of every record, followed by their distinct broader terms - all the mappings below
+        # are computed once for every distinct term
+        terms = MultiValueColumn.from_series(df[arch_mat_col]).map(str.strip)
+        broader_terms = terms.map(find_broader_term)
+        broader_terms = broader_terms.filter(pd.notnull(broader_terms.values))
+        terms = terms.append(broader_terms.dedupe())
+
+        mapper_655_to_999 = Authority_instance.mapper_655_to_999
+        codes_999 = terms.map(
+            lambda term: "$$a" + mapper_655_to_999[term]
+            if term in mapper_655_to_999
+            else None
+        )
+        codes_999 = codes_999.filter(pd.notnull(codes_999.values))
+        df["999"] = codes_999.dedupe().render(";")
+        df["655 7"] = terms.map(Authority_instance.arch_mat_mapping_dict).render(";")
 
         df["655 7"] = df["655 7"].str.replace("$$a$$a", "$$a")
 
@@ -975,49 +962,58 @@ def create_MARC_506_post_copyright(df, cols):
     return df
 
 
-def create_MARC_041(df):
+def create_MARC_041(df, language_mapper=None, report=False):
     """
     fuction's input is the entire table as a dataframe and constructs the 041 field according to the [שפה] column.
+    The MARC code of the first language of every record is also written to positions 35-37 of its 008 field.
+    Languages which are not in the languages authority file are left out, and reported.
 
     :param df: the entire table
-    :return: the new data frame with the new MARC 041 encoded Field
+    :param language_mapper: language name -> MARC language code (default: from the Authority)
+    :param report: return also a report of the languages which were not mapped
+    :return: the new data frame with the new MARC 041 encoded Field, and if report is True - a dataframe of
+        the languages not mapped (column: language), indexed by the index of their record
     """
-    col = "שפה"
-    # TODO if column שפה is empty, then it is dropped. Why?
-    try:
-        col
-    except NameError:
-        print("col variable not defined")
-        pass
-    else:
-        language_mapper = Authority_instance.df_languages.to_dict()
+    logger = logging.getLogger(__name__)
+    if language_mapper is None:
+        language_mapper = Authority_instance.language_code_mapper
 
-        for index, row in df.iterrows():
-            if row["שפה"] == "":
-                # if row['סוג חומר'] ==
-                continue
-            languages = row["שפה"].split(";")
-            try:
-                new_lang = [
-                    "$$a" + language_mapper["קוד שפה"][k]
-                    for k in languages
-                    if len(languages) > 0
-                ]
-                df.loc[index, "041"] = "".join(new_lang)
-            except:
-                print("problem with ", index)
-                sys.stderr.write(f"problem with languages in {index}")
-            field_008 = list(row["008"])
-
-            # insert MARC langauge code in positions 35-37
-            for i in range(35, 38):
-                field_008[i] = new_lang[0][i - 32]
-
-            df.loc[index, "008"] = "".join(field_008)
-
-        # df = drop_col_if_exists(df, 'שפה')
+    languages = MultiValueColumn.from_series(df["שפה"])
+    languages = languages.filter(languages.values != "")
+    codes = languages.map(lambda language: language_mapper.get(language) or None)
 
-    return df
+    unmapped = pd.isnull(codes.values)
+    df_report = pd.DataFrame(
+        {"language": languages.values[unmapped]},
+        index=languages.index[languages.row_ids[unmapped]],
+    )
+    for language, records in df_report.groupby("language").groups.items():
+        logger.error(
+            f"[041] Language [{language}] is not in the languages authority file - "
+            f"{len(records)} records, e.g. {list(records[:5])}"
+        )
+
+    codes = codes.filter(~unmapped)
+    has_codes = codes.lengths > 0
+    if has_codes.any():
+        df.loc[has_codes, "041"] = (
+            codes.map(lambda code: "$$a" + code).render("")[has_codes].to_numpy()
+        )
+        # insert MARC langauge code of the first language in positions 35-37, cut or
+        # padded to the three positions of the element
+        start, end = LANGUAGE_POSITIONS
+        df["008"] = (
+            Field008.from_series(df["008"])
+            .patch(
+                start,
+                codes.values[codes.offsets[:-1][has_codes]].tolist(),
+                rows=has_codes,
+                width=end - start,
+            )
+            .to_series()
+        )
+
+    return (df, df_report) if report else df
 
 
 # TODO change the 542    to the new fields.
@@ -1154,14 +1150,23 @@ def check_date_values_in_row(date_start, date_end, date_free_text, index):
         return years[0], years[1]
 
 
-def map_countries(countries_list: str) -> (list, str):
+def country_code_008(code):
+    """
+    :param code: a MARC country code
+    :return: the code as written in the three positions of the 008 field - two letter codes are
+        padded with #, and longer codes are cut
+    """
+    return code.strip()[:3].ljust(3, FILL_CHARACTER)
+
+
+def map_countries(countries_list: str, countries_code_mapper=None) -> (list, str):
     """
 
     @param countries_list:
+    @param countries_code_mapper: country name -> MARC country code (default: from the Authority)
     """
-    countries_code_mapper = Authority_instance.df_countries.set_index(
-        "מדינת פרסום"
-    ).to_dict()["MARC"]
+    if countries_code_mapper is None:
+        countries_code_mapper = Authority_instance.countries_code_mapper
 
     countries = countries_list.split(";")
     countries = list(filter(None, countries))
@@ -1175,40 +1180,75 @@ def map_countries(countries_list: str) -> (list, str):
         except KeyError as e:
             sys.stderr.write(f"This is not a country {e}! (please correct")
             sys.exit()
-        first_country = field_008_country[0][3:]
-        if len(first_country) == 2:
-            first_country += "#"
+        first_country = country_code_008(field_008_country[0][3:])
     return field_008_country, first_country
 
 
-def create_MARC_260_044_008_countries(df, country_col):
-    for index, row in df.iterrows():
-        if row[country_col] != "" or row[country_col] is not None:
-
-            # update 008 country
-            field_008_country, first_country = map_countries(row[country_col])
-            countries = [
-                "$$e[" + x.strip() + "]" if x != "" else ""
-                for x in row[country_col].split(";")
-            ]
+def create_MARC_260_044_008_countries(df, country_col, countries_code_mapper=None):
+    """
+        adds the publication countries of every record to the 260 field ($e), constructs the 044
+        field from their MARC codes, and writes the code of the first country over the "xx#" country
+        placeholder (positions 18-20) of the 008 field.
+    :param df: the entire table
+    :param country_col: the column of the publication countries
+    :param countries_code_mapper: country name -> MARC country code (default: from the Authority)
+    :return: the modified dataframe
+    """
+    if countries_code_mapper is None:
+        countries_code_mapper = Authority_instance.countries_code_mapper
 
-            # update 260  country
-            df.loc[index, "260"] = df.loc[index, "260"] + "".join(countries)
+    countries = MultiValueColumn.from_series(df[country_col])
 
-            # update 044 country code
-            if field_008_country is not None:
-                df.loc[index, "044"] = "".join(field_008_country)
+    # update 260 country
+    df["260"] = df["260"] + countries.map(
+        lambda x: "$$e[" + x.strip() + "]" if x != "" else ""
+    ).render("")
 
-        else:
-            df.loc[
-                index, "044"
-            ] = "xx#"  # code xx# is xx# No place, unknown, or undetermined
+    countries = countries.filter(countries.values != "")
+    codes = countries.map(lambda country: countries_code_mapper.get(country))
+    unknown = pd.isnull(codes.values)
+    if unknown.any():
+        sys.stderr.write(
+            f"This is not a country {pd.unique(countries.values[unknown]).tolist()}! "
+            f"(please correct"
+        )
+        sys.exit()
 
+    # update 044 country code
+    has_countries = codes.lengths > 0
+    df.loc[has_countries, "044"] = (
+        codes.map(lambda code: "$$a" + code).render("")[has_countries].to_numpy()
+    )
     df = remove_duplicate_in_column(df, "044")
+
+    # update 008 country
+    first_codes = codes.values[codes.offsets[:-1][has_countries]].tolist()
+    odd_width = [
+        (record, code)
+        for record, code in zip(df.index[has_countries], first_codes)
+        if len(code.strip()) not in (2, 3)
+    ]
+    if odd_width:
+        logging.getLogger(__name__).error(
+            f"[008] {len(odd_width)} country codes are not two or three letters long and "
+            f"were cut or padded in 008, e.g. {odd_width[:5]}"
+        )
+    if has_countries.any():
+        start, end = COUNTRY_POSITIONS
+        df["008"] = (
+            Field008.from_series(df["008"])
+            .patch(
+                start,
+                [country_code_008(code) for code in first_codes],
+                rows=has_countries,
+                width=end - start,
+            )
+            .to_series()
+        )
     return df
 
 
-def create_MARC_260_008_date(df, start_date, end_date, text_date):
+def create_MARC_260_008_date(df, start_date, end_date, text_date, report=False):
     """
         fuction's input is the entire table as a dataframe and constructs the 260 field according to the POST_COPYRIGHT
         file.
@@ -1220,23 +1260,20 @@ def create_MARC_260_008_date(df, start_date, end_date, text_date):
 
         :param date_cols:
         :param df: the entire table
-        :return: the new data frame with the new MARC 008 encoded Field
+        :param report: return also a report of the dates which could not be normalized
+        :return: the new data frame with the new MARC 008 encoded Field, and if report is True - a
+            dataframe of the dates which could not be normalized (columns: column, date), indexed by
+            the index of their record
         """
 
     logger = logging.getLogger(__name__)
 
-    df[start_date] = (
-        df[start_date]
-            .astype(str)
-            .replace(r"\.0$", "", regex=True)
-            .apply(clean_date_format)
-    )
-    df[end_date] = (
-        df[end_date]
-            .astype(str)
-            .replace(r"\.0$", "", regex=True)
-            .apply(clean_date_format)
-    )
+    reports = list()
+    for date_col in (start_date, end_date):
+        dates = df[date_col].astype(str).replace(r"\.0$", "", regex=True)
+        df[date_col], failures = clean_date_column(dates)
+        reports.append(date_failures_report(dates, failures))
+    df_report = pd.concat(reports)
 
     """
     **************************************************************************************************** 
@@ -1265,7 +1302,7 @@ def create_MARC_260_008_date(df, start_date, end_date, text_date):
         except Exception as e:
             print(e)
 
-    return df
+    return (df, df_report) if report else df
 
 
 def create_MARC_520(df):
@@ -1360,81 +1397,64 @@ def format_cat_date(df):
 
 
 def create_date_format(string_date):
-    logger = logging.getLogger(__name__)
-    string_date_to_datetime = ""
-    date_formats = [
-        "%Y-%m-%d",
-        "%Y-%m",
-        "%Y-%m",
-        "%Y-%m-%d %H:%M",
-        "%d-%m-%Y",
-        "%Y-%m-%d %H:%M:%S",
-        "%d/%m/%Y",
-        "%m/%d/%Y",
-        "%m/%d/%Y %H:%M:%S",
-        "%Y%m%d %H:%M",
-        "%d/%m/%Y %H:%M",
-        "%m/%d/%y %H:%M",
-        "%d-%m-%Y",
-    ]
-    i = 0
-    while True:
-        try:
-            string_date_to_datetime = datetime.strptime(string_date, date_formats[i])
-            break
-        except ValueError:
-            i += 1
-        except IndexError:
-            logger.error(
-                f"[921/933] didn't find the right date format for [{string_date}]"
-            )
-            sys.exit()
-    return datetime.strftime(string_date_to_datetime, "%Y%m")
-
-
-def construct_921(df):
-    df["921"] = df["921"].map(Authority_instance.cataloger_name_mapper)
-
-    try:
-        df["921"] = (
-                "$$a"
-                + df["921"].map(str)
-                + " "
-                + df["תאריך הרישום"].apply(create_date_format)
+    """
+        converts a cataloguing date to the YYYYMM format of the 921/933 fields.
+        To convert a whole column use dates.cataloguing_month_column.
+    :param string_date: the cataloguing date
+    :return: the YYYYMM date
+    """
+    month = CATALOGUING_DATES.normalize(str(string_date))
+    if month is None:
+        logging.getLogger(__name__).error(
+            f"[921/933] didn't find the right date format for [{string_date}]"
         )
-    except:
         sys.exit()
-    df["921"].apply(lambda x: "$$a" + x)
+    return month
+
+
+def construct_921(df, months=None):
+    """
+        maps the (first) cataloguer of every record to its Aleph code, and constructs the 921 field -
+        "$$a[cataloguer code] [YYYYMM]".
+    :param df: the original dataframe
+    :param months: the cataloguing dates of the records in YYYYMM format (computed if not given)
+    :return: the modified dataframe with the new 921 field
+    """
+    if months is None:
+        months = cataloguing_month_column(df["תאריך הרישום"])
+    codes = df["921"].map(Authority_instance.cataloger_name_mapper)
+    df["921"] = "$$a" + codes.map(str) + " " + months
     return df
 
 
-def construct_933(df):
-    df_explode_933 = (
-        df["933"]
-            .str.split(";", expand=True)
-            .rename(columns=lambda x: f"933_{x + 1}")
-            .replace(np.nan, "")
-            .replace("nan", "")
+def construct_933(df, months=None):
+    """
+        maps the rest of the cataloguers of every record to their Aleph codes, and constructs a 933
+        field for every one of them - "$$a[cataloguer code] [YYYYMM]" - in the columns 933_1, 933_2 ...
+        Cataloguers without a code are left empty (and a "nan" code as is).
+    :param df: the original dataframe
+    :param months: the cataloguing dates of the records in YYYYMM format (computed if not given)
+    :return: the modified dataframe with the new 933 fields
+    """
+    if months is None:
+        months = cataloguing_month_column(df["תאריך הרישום"])
+    cataloguers = MultiValueColumn.from_series(df["933"])
+    codes = pd.Series(
+        cataloguers.map(Authority_instance.cataloger_name_mapper.get).values
     )
-    for col in list(df_explode_933):
-        df_explode_933[col] = df_explode_933[col].map(
-            Authority_instance.cataloger_name_mapper
-        )
-    df_explode_933 = df_explode_933.replace(np.nan, "")
-    df = pd.concat([df, df_explode_933], axis=1)
+    signatures = (
+            "$$a"
+            + codes.map(str)
+            + " "
+            + pd.Series(months.to_numpy()[cataloguers.row_ids], dtype=object)
+    )
+    unsigned = codes.isnull() | codes.isin(["", "nan"])
+    signatures[unsigned] = codes[unsigned].fillna("")
 
-    # TODO rewrite this loop - too messy
-    for index, row in df.iterrows():
-        for col in list(df_explode_933.columns):
-            if row[col] == "" or row[col] == np.nan or row[col] == "nan":
-                continue
-            else:
-                df.loc[index, col] = (
-                        "$$a"
-                        + str(row[col])
-                        + " "
-                        + create_date_format(df.loc[index, "תאריך הרישום"])
-                )
+    signatures = MultiValueColumn(
+        signatures.to_numpy(dtype=object), cataloguers.offsets, cataloguers.index
+    )
+    df = pd.concat([df, signatures.to_columns("933").fillna("")], axis=1)
     df = drop_col_if_exists(df, "933")
     return df
 
@@ -1467,18 +1487,23 @@ def create_MARC_921_933(df):
     # initialize 921/933 columns
     df["921"] = df["שם הרושם"]
 
-    if df["921"].str.contains(";").any():
+    multiple_cataloguer = df["921"].str.contains(";", na=False)
+    if multiple_cataloguer.any():
+        # the first cataloguer goes to 921 (the second one if the first is "[]"), the rest to 933
+        first, _, rest = (
+            df.loc[multiple_cataloguer, "921"].str.partition(";").T.to_numpy()
+        )
+        first, rest = pd.Series(first, dtype=object), pd.Series(rest, dtype=object)
+        first = first.where(first != "[]", rest.str.partition(";")[0])
         df["933"] = ""
-        multiple_cataloguer = df[df["921"].str.contains(";")].index.values
-        for index in multiple_cataloguer:
-            first_cataloguer = first_creator(df.loc[index, "921"]).strip()
-            df.loc[index, "933"] = all_rest_creators(df.loc[index, "921"]).strip()
-            df.loc[index, "921"] = first_cataloguer
+        df.loc[multiple_cataloguer, "933"] = rest.str.strip().to_numpy()
+        df.loc[multiple_cataloguer, "921"] = first.str.strip().to_numpy()
 
-    df = construct_921(df)
+    months = cataloguing_month_column(df["תאריך הרישום"])
+    df = construct_921(df, months)
 
     if column_exists(df, "933"):
-        df = construct_933(df)
+        df = construct_933(df, months)
 
     return df
 
@@ -1663,8 +1688,8 @@ def create_MARC_630(df):
     return df
 
 
-def update_008_no_linguistic_content(val_008):
-    return "".join((val_008[:35], "zxx", val_008[38:]))
+# the RDA content type of still images - records of still images only have no linguistic content
+STILL_IMAGE_336 = "$$astill image$$bsti$$2rdacontent"
 
 
 def create_MARC_336(df):
@@ -1683,32 +1708,28 @@ def create_MARC_336(df):
             to the RDA content type terms and constructed the subfields according to the agreed upon mapping with Ahava.
             (Archival Material - RDA content type mapping table)
     :param df:
-    :return:
+    :return: the modified dataframe with the 336_1, 336_2 ... columns, and the dataframe of the 336 columns
     """
-    arch_mat_map_336 = (
-        Authority_instance.df_arch_mat_auth.loc[
-        :, ["ARCHIVAL_MATERIAL", "rdacontent 336"]
-        ]
-            .set_index("ARCHIVAL_MATERIAL")
-            .to_dict()["rdacontent 336"]
+    content_types = (
+        MultiValueColumn.from_series(df["סוג חומר"])
+        .map(str.strip)
+        .map(Authority_instance.arch_mat_map_336)
     )
 
-    for index, row in df.iterrows():
-        lst_336 = row["סוג חומר"].split(";")
-        lst_336 = list(map(str.strip, lst_336))
-        lst_336 = replace_lst_dict(lst_336, arch_mat_map_336)
-        if len(lst_336) == 1 and lst_336[0] == "$$astill image$$bsti$$2rdacontent":
-            df.loc[index, "008"] = update_008_no_linguistic_content(row["008"])
-        df.loc[index, "336"] = ";".join(lst_336)
-
-    df = remove_duplicate_in_column(df, "336")
+    # records of a single still image term have no linguistic content
+    single = content_types.lengths == 1
+    single_content_type = np.full(len(content_types), None, dtype=object)
+    single_content_type[single] = content_types.values[content_types.offsets[:-1][single]]
+    still_image_only = single_content_type == STILL_IMAGE_336
+    if still_image_only.any():
+        df["008"] = (
+            Field008.from_series(df["008"])
+            .patch(LANGUAGE_POSITIONS[0], "zxx", rows=still_image_only)
+            .to_series()
+        )
 
-    df_explode_336 = (
-        df["336"].str.split(";", expand=True).rename(columns=lambda x: f"336_{x + 1}")
-    )
-    df_explode_336 = df_explode_336.replace(np.nan, "")
+    df_explode_336 = content_types.dedupe().to_columns("336").fillna("")
     df = pd.concat([df, df_explode_336], axis=1)
-    cols_336 = [x for x in list(df.columns.values) if "336" in x]
     df = drop_col_if_exists(df, "336")
     df = drop_col_if_exists(df, "סוג חומר")
 
@@ -1770,19 +1791,16 @@ def create_MARC_534(df):
 
     df = remove_duplicate_in_column(df, "מדיה + פורמט")
 
-    for index, row in df.iterrows():
-        try:
-            lst_534 = row["מדיה + פורמט"].split(";")
-        except:
-            print(df.columns)
-        lst_534_final = [
-            "$$pמנשא והפורמט הפיזי של הפריט המקורי." + "$$e" + s.strip()
+    df["534"] = (
+        MultiValueColumn.from_series(df["מדיה + פורמט"])
+        .map(
+            lambda s: "$$pמנשא והפורמט הפיזי של הפריט המקורי." + "$$e" + s.strip()
             if s != ""
             else ""
-            for s in lst_534
-        ]
-        lst_534_final = replace_lst_dict(lst_534_final, arch_media_format_map_534)
-        df.loc[index, "534"] = ";".join(lst_534_final)
+        )
+        .map(arch_media_format_map_534)
+        .render(";")
+    )
 
     df = remove_duplicate_in_column(df, "534")
     df = explode_col_to_new_df(df, "534")
@@ -2056,15 +2074,25 @@ def add_MARC_597(collection):
     return collection
 
 
-def export_MARCXML_final_table(collection):
+def export_MARCXML_final_table(collection, formats=("xml",), workers=1):
+    """
+        Exports the MARC fields of the final table to the final MARC files of the collection.
+    :param collection: The collection object
+    :param formats: the output formats, written in a single pass over the table:
+        xml (MARC XML), seq (MARC sequential file for Aleph), mrc (binary MARC21 - ISO 2709)
+    :param workers: the number of worker processes to serialize the records in (default 1)
+    :return: the collection object, with the exported table in the marc_data attribute
+    """
     logger = logging.getLogger()
-    logger.info(f"[MARCXML] create final MARC XML file for {collection.collection_id}")
+    logger.info(
+        f"[MARCXML] create final MARC files ({', '.join(formats)}) for {collection.collection_id}"
+    )
     df_final_cols = [
                         x for x in list(collection.df_final_data.columns) if x[0].isdigit()
                     ] + ["LDR"]
     collection.marc_data = collection.df_final_data[df_final_cols]
 
-    counter, run_time = collection.create_MARC_XML()
+    counter, run_time = collection.create_marc_files(formats, workers=workers)
     sys.stderr.write(
         f"{counter} total records written to file in {run_time} seconds.\n\n"
     )
@@ -0,0 +1,189 @@
+"""
+Fuzzy matching of values against a controlled vocabulary.
+
+A VocabularyMatcher is built once per vocabulary: every term is normalized once, instead of once for
+every matched value, and the terms are indexed by their normalized form. Values which are exact
+vocabulary terms are answered without any scoring. A value whose normalized form is the normalized
+form of enough terms is answered from the index, since with the default scorers only those terms can
+score 100 - every other value is scored against all the terms, so its matches are exactly those of
+fuzzywuzzy.process.extract (or difflib.get_close_matches, see VocabularyMatcher.close_match). The
+results are memoized, so repeated values (very common in a catalog) are matched only once.
+"""
+import difflib
+import heapq
+import logging
+
+from fuzzywuzzy import fuzz, utils
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(value):
+    """
+    normalizes a value the way fuzzywuzzy.process does before scoring: lower case, no punctuation and
+    no surrounding whitespaces.
+    :param value: the value to normalize
+    :return: the normalized string
+    """
+    return utils.full_process(utils.full_process(str(value)), force_ascii=True)
+
+
+def wratio(query, choice):
+    """
+    the fuzzywuzzy.process default scorer, on values which are already normalized.
+    """
+    return fuzz.WRatio(query, choice, full_process=False)
+
+
+def sequence_ratio(query, choice):
+    """
+    the difflib.get_close_matches similarity (0-100), on values which are already normalized.
+    """
+    # get_close_matches compares the choice (first sequence) to the query (second sequence)
+    return difflib.SequenceMatcher(None, choice, query).ratio() * 100
+
+
+def split_exact_hits(values, terms, tag="MATCH"):
+    """
+    splits values into exact vocabulary hits and unknown values with a single set lookup per value,
+    so that only the unknown values go to fuzzy scoring, and logs the hit ratio.
+    :param values: the values to check
+    :param terms: the terms of the vocabulary (preferably a set)
+    :param tag: the tag of the log message
+    :return: the list of exact hits and the list of unknown values, in the order of the values
+    """
+    hits, misses = list(), list()
+    for value in values:
+        (hits if value in terms else misses).append(value)
+    total = len(hits) + len(misses)
+    if total > 0:
+        logger.info(
+            f"[{tag}] {len(hits)} of {total} values ({len(hits) / total:.1%}) are exact "
+            f"vocabulary hits, {len(misses)} go to fuzzy matching"
+        )
+    return hits, misses
+
+
+def only_identical_score_100(scorer, query):
+    """
+    whether only the terms whose normalized form is the (normalized) query can score 100 against it.
+    True for sequence_ratio, and for wratio on non empty queries shorter than 100 characters: the
+    other wratio scores are scaled below 100, and the rounded ratio of two different strings reaches
+    100 only if their lengths add up to 200 at least.
+    :param scorer: the scorer of the matcher
+    :param query: the normalized value to match
+    """
+    if scorer is sequence_ratio:
+        return True
+    return scorer is wratio and 0 < len(query) < 100
+
+
+class VocabularyMatcher:
+    """
+    Matches values against the terms of a controlled vocabulary.
+    """
+
+    def __init__(self, choices, scorer=wratio, normalizer=normalize):
+        """
+        :param choices: the terms of the vocabulary
+        :param scorer: a function (normalized query, normalized choice) -> score between 0 and 100
+            (default: fuzzywuzzy WRatio)
+        :param normalizer: the function which normalizes the values before scoring (default: the
+            fuzzywuzzy full_process)
+        """
+        self.choices = [str(choice) for choice in choices]
+        self.scorer = scorer
+        self.normalizer = normalizer
+        self.terms = set(self.choices)
+        self.normalized = [normalizer(choice) for choice in self.choices]
+        # normalized form -> the terms which have it, in vocabulary order
+        self.index = dict()
+        for choice, normalized in zip(self.choices, self.normalized):
+            self.index.setdefault(normalized, list()).append(choice)
+        self._results = dict()
+
+    def __contains__(self, value):
+        return value in self.terms
+
+    def __len__(self):
+        return len(self.choices)
+
+    def scores(self, value):
+        """
+        :param value: the value to match
+        :return: a list of (term, score) tuples of all the terms, in vocabulary order
+        """
+        query = self.normalizer(value)
+        return [
+            (choice, self.scorer(query, normalized))
+            for choice, normalized in zip(self.choices, self.normalized)
+        ]
+
+    def identical(self, value):
+        """
+        :param value: the value to match
+        :return: the terms which score 100 because their normalized form is that of the value, in
+            vocabulary order - None if other terms may score 100 as well, and the value must be scored
+            against all the terms
+        """
+        query = self.normalizer(value)
+        if not only_identical_score_100(self.scorer, query):
+            return None
+        return self.index.get(query, list())
+
+    def extract(self, value, limit=5):
+        """
+        finds the best matching terms of a value - as fuzzywuzzy.process.extract, with ties in
+        vocabulary order. A value which is an exact vocabulary term is returned as its only match, with
+        a score of 100.
+        :param value: the value to match
+        :param limit: the maximal number of matches to return
+        :return: a list of (term, score) tuples, best match first
+        """
+        key = ("extract", value, limit)
+        if key not in self._results:
+            identical = None if value in self.terms else self.identical(value)
+            if value in self.terms:
+                result = [(value, 100)]
+            elif identical is not None and len(identical) >= limit:
+                result = [(choice, 100) for choice in identical[:limit]]
+            else:
+                result = heapq.nlargest(
+                    limit, self.scores(value), key=lambda match: match[1]
+                )
+            self._results[key] = result
+        return self._results[key]
+
+    def extract_one(self, value):
+        """
+        :param value: the value to match
+        :return: the best matching (term, score) tuple, None if the vocabulary is empty
+        """
+        result = self.extract(value, limit=1)
+        return result[0] if result else None
+
+    def close_match(self, value, cutoff=60):
+        """
+        finds the closest term of a value - as difflib.get_close_matches(value, terms, n=1): of the terms
+        whose score is at least the cutoff, the best one, and of equal scores the greatest term.
+        :param value: the value to match
+        :param cutoff: the minimal score of a match
+        :return: the closest (term, score) tuple, None if no term scores at least the cutoff
+        """
+        key = ("close_match", value, cutoff)
+        if key not in self._results:
+            identical = self.identical(value)
+            if identical and cutoff <= 100:
+                result = (max(identical), 100)
+            else:
+                matches = [
+                    (score, choice)
+                    for choice, score in self.scores(value)
+                    if score >= cutoff
+                ]
+                result = tuple(reversed(max(matches))) if len(matches) > 0 else None
+            self._results[key] = result
+        return self._results[key]
+
+    def cache_info(self):
+        return f"{len(self._results)} values matched against {len(self)} terms"
@@ -0,0 +1,198 @@
+"""
+Columnar representation of multi-value cells.
+
+Many of the catalog fields hold several values in one cell, delimited by a semicolon (for example
+"עברית;אנגלית"). A MultiValueColumn parses such a column once into a flat array of all the values
+and an array of offsets (the position of the first value of every row in the flat array), so the
+values can be mapped, filtered and de-duplicated for the whole column at once, and rendered back to
+delimited strings - or exploded into separate columns - only when needed.
+"""
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+
+class MultiValueColumn:
+    """
+    A column of multi-value cells: values[offsets[i]:offsets[i + 1]] are the values of row i.
+    """
+
+    def __init__(self, values, offsets, index=None, name=None):
+        """
+        :param values: the flat array of the values of all the rows
+        :param offsets: the start position of every row in values, followed by the number of values
+        :param index: the index of the rows (default: a RangeIndex)
+        :param name: the name of the column
+        """
+        self.values = np.asarray(values, dtype=object)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.index = pd.RangeIndex(len(self)) if index is None else index
+        self.name = name
+
+    @classmethod
+    def from_series(cls, series, sep=";", strip=False):
+        """
+        parses a column of delimited strings. Cells which are not strings (NaN) have no values,
+        an empty string is a single empty value (as in str.split).
+        :param series: the column
+        :param sep: the delimiter of the values (default: semicolon)
+        :param strip: strip whitespaces around the values
+        :return: the MultiValueColumn
+        """
+        split_values = [
+            cell.split(sep) if isinstance(cell, str) else [] for cell in series.tolist()
+        ]
+        lengths = np.fromiter(map(len, split_values), dtype=np.int64, count=len(series))
+        offsets = np.zeros(len(series) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        values = np.empty(offsets[-1], dtype=object)
+        values[:] = list(chain.from_iterable(split_values))
+        column = cls(values, offsets, series.index, series.name)
+        if strip:
+            column = column.map(str.strip)
+        return column
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self):
+        """
+        the number of values of each row
+        """
+        return np.diff(self.offsets)
+
+    @property
+    def row_ids(self):
+        """
+        the row (position) of each value in the flat values array
+        """
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def _with_values(self, values, offsets=None):
+        return MultiValueColumn(
+            values, self.offsets if offsets is None else offsets, self.index, self.name
+        )
+
+    def unique(self):
+        """
+        :return: the distinct values of the column, in order of first appearance
+        """
+        return pd.unique(self.values).tolist()
+
+    def map(self, mapper):
+        """
+        maps every value - the mapper is applied once for every distinct value.
+        :param mapper: a function, or a dictionary (values which are not in the dictionary are kept)
+        :return: a new MultiValueColumn with the mapped values
+        """
+        if isinstance(mapper, dict):
+            mapping = mapper
+            mapper = lambda value: mapping.get(value, value)
+        codes, uniques = pd.factorize(self.values)
+        mapped = np.empty(len(uniques), dtype=object)
+        mapped[:] = [mapper(value) for value in uniques]
+        return self._with_values(mapped[codes] if len(codes) else self.values)
+
+    def filter(self, predicate):
+        """
+        keeps only the values for which the predicate is true.
+        :param predicate: a function (applied once for every distinct value), or a boolean array
+            aligned with the values
+        :return: a new MultiValueColumn with the kept values
+        """
+        if callable(predicate):
+            codes, uniques = pd.factorize(self.values)
+            keep = np.array([bool(predicate(value)) for value in uniques], dtype=bool)
+            keep = keep[codes] if len(codes) else np.zeros(0, dtype=bool)
+        else:
+            keep = np.asarray(predicate, dtype=bool)
+
+        lengths = np.bincount(self.row_ids[keep], minlength=len(self))
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return self._with_values(self.values[keep], offsets)
+
+    def duplicated(self):
+        """
+        :return: a boolean array aligned with the values - True for a value which already appeared
+            earlier in the same row
+        """
+        df = pd.DataFrame({"row": self.row_ids, "value": self.values})
+        return df.duplicated().to_numpy()
+
+    def dedupe(self):
+        """
+        :return: a new MultiValueColumn without duplicate values in a row - the first appearance of
+            every value is kept, in the original order.
+        """
+        return self.filter(~self.duplicated())
+
+    def in_row(self, other):
+        """
+        :param other: a MultiValueColumn of the same rows
+        :return: a boolean array aligned with the values - True for a value which appears in the same
+            row of the other column
+        """
+        keys = pd.MultiIndex.from_arrays([self.row_ids, self.values])
+        other_keys = pd.MultiIndex.from_arrays([other.row_ids, other.values])
+        return keys.isin(other_keys)
+
+    def append(self, other):
+        """
+        :param other: a MultiValueColumn of the same rows
+        :return: a new MultiValueColumn in which the values of every row of the other column follow the
+            values of the same row of this column
+        """
+        row_ids = np.concatenate([self.row_ids, other.row_ids])
+        order = np.argsort(row_ids, kind="stable")
+        values = np.concatenate([self.values, other.values])[order]
+        return self._with_values(values, self.offsets + other.offsets)
+
+    def explode(self):
+        """
+        :return: a Series of all the values, one value per row, indexed by the index of their row
+        """
+        return pd.Series(self.values, index=self.index[self.row_ids], name=self.name)
+
+    def render(self, sep=";"):
+        """
+        joins the values of every row back into a string.
+        :param sep: the delimiter (default: semicolon); use "" to concatenate values which are already
+            formatted as MARC subfields ($$a...)
+        :return: a Series of strings, with the index of the column
+        """
+        values = self.values.tolist()
+        offsets = self.offsets.tolist()
+        return pd.Series(
+            [
+                sep.join(values[start:end])
+                for start, end in zip(offsets[:-1], offsets[1:])
+            ],
+            index=self.index,
+            name=self.name,
+            dtype=object,
+        )
+
+    def to_columns(self, name=None, start=0):
+        """
+        explodes the values into separate columns - as str.split(expand=True): the i-th value of every
+        row goes into the i-th column, and rows with less values are padded with None.
+        :param name: the prefix of the new column names (default: the name of the column)
+        :param start: the number of the first column minus one - the columns are named <name>_<start + 1>,
+            <name>_<start + 2>, ...
+        :return: a DataFrame of the new columns, with the index of the column
+        """
+        name = self.name if name is None else name
+        width = max(int(self.lengths.max()) if len(self) else 0, 1)
+        matrix = np.full((len(self), width), None, dtype=object)
+        row_ids = self.row_ids
+        positions = np.arange(len(self.values)) - self.offsets[row_ids]
+        matrix[row_ids, positions] = self.values
+        return pd.DataFrame(
+            matrix,
+            index=self.index,
+            columns=[f"{name}_{start + i + 1}" for i in range(width)],
+        )
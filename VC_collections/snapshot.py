@@ -0,0 +1,182 @@
+"""
+Local on-disk snapshots of Google Sheets worksheets.
+
+Every worksheet of a spreadsheet is pickled into its own file, next to a JSON manifest which records
+the snapshot format version, the spreadsheet id, the Drive modifiedTime of the spreadsheet when it was
+downloaded, and when the snapshot was last checked against Google Drive.
+"""
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from hashlib import sha1
+from pathlib import Path
+
+import pandas as pd
+from gspread.urls import DRIVE_FILES_API_V3_URL
+
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE_NAME = "manifest.json"
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+logger = logging.getLogger(__name__)
+
+
+def get_modified_time(client, file_id):
+    """
+    Fetches the Drive modifiedTime of a spreadsheet - a single metadata request, much cheaper than
+    downloading the worksheets themselves.
+    :param client: an authorized gspread client
+    :param file_id: the file id of the google spreadsheet
+    :return: the modifiedTime string (RFC 3339) or None if it could not be retrieved
+    """
+    try:
+        response = client.request(
+            "get",
+            f"{DRIVE_FILES_API_V3_URL}/{file_id}",
+            params={"fields": "modifiedTime", "supportsAllDrives": True},
+        )
+    except Exception as e:
+        logger.warning(f"[SNAPSHOT] Could not fetch modifiedTime of {file_id}: {e}")
+        return None
+    return response.json().get("modifiedTime")
+
+
+class SnapshotStore:
+    """
+    A versioned store of pickled worksheets (pandas DataFrames) of a single spreadsheet.
+    """
+
+    def __init__(self, path, spreadsheet_id=""):
+        """
+        :param path: the directory in which the snapshot is kept
+        :param spreadsheet_id: the file id of the google spreadsheet the snapshot was taken from
+        """
+        self.path = Path(path)
+        self.spreadsheet_id = spreadsheet_id
+        self._manifest = None
+
+    @property
+    def manifest_path(self):
+        return self.path / MANIFEST_FILE_NAME
+
+    @property
+    def manifest(self):
+        """
+        the manifest of the snapshot. An empty manifest is returned if there is no snapshot yet, or if the
+        snapshot on disk was written by a different snapshot format version or for another spreadsheet.
+        """
+        if self._manifest is None:
+            manifest = {}
+            if self.manifest_path.is_file():
+                with open(self.manifest_path, encoding="utf8") as f:
+                    manifest = json.load(f)
+            if manifest.get("version") != SNAPSHOT_VERSION or (
+                self.spreadsheet_id
+                and manifest.get("spreadsheet_id") != self.spreadsheet_id
+            ):
+                manifest = {}
+            manifest.setdefault("version", SNAPSHOT_VERSION)
+            manifest.setdefault("spreadsheet_id", self.spreadsheet_id)
+            manifest.setdefault("modified_time", None)
+            manifest.setdefault("checked_at", None)
+            manifest.setdefault("sheets", {})
+            self._manifest = manifest
+        return self._manifest
+
+    def write_manifest(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        temp_path = self.manifest_path.with_suffix(".tmp")
+        with open(temp_path, encoding="utf8", mode="w") as f:
+            f.write(json.dumps(self.manifest, indent=4, ensure_ascii=False))
+        os.replace(temp_path, self.manifest_path)
+
+    @staticmethod
+    def sheet_file_name(sheet):
+        # worksheet names are mostly in Hebrew - keep the file names ascii
+        return sha1(sheet.encode("utf8")).hexdigest()[:16] + ".pkl"
+
+    def has_sheet(self, sheet):
+        entry = self.manifest["sheets"].get(sheet)
+        return entry is not None and (self.path / entry["file"]).is_file()
+
+    def has_sheets(self, sheets):
+        return all(self.has_sheet(sheet) for sheet in sheets)
+
+    def is_current(self, sheet):
+        """
+        :return: True if the worksheet was saved from the latest known version of the spreadsheet
+        """
+        return (
+            self.has_sheet(sheet)
+            and self.manifest["modified_time"] is not None
+            and self.manifest["sheets"][sheet].get("modified_time")
+            == self.manifest["modified_time"]
+        )
+
+    def load_sheet(self, sheet):
+        """
+        :param sheet: the name of the worksheet
+        :return: the snapshot of the worksheet as a pandas DataFrame
+        """
+        return pd.read_pickle(self.path / self.manifest["sheets"][sheet]["file"])
+
+    def save_sheet(self, sheet, df, modified_time=None, write_manifest=True):
+        """
+        Pickles a worksheet into the snapshot directory and registers it in the manifest.
+        :param sheet: the name of the worksheet
+        :param df: the worksheet as a pandas DataFrame
+        :param modified_time: the Drive modifiedTime of the spreadsheet the worksheet was downloaded from
+        :param write_manifest: write the manifest to disk right away (default True)
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        file_name = self.sheet_file_name(sheet)
+        df.to_pickle(self.path / file_name)
+        self.manifest["sheets"][sheet] = {
+            "file": file_name,
+            "rows": len(df),
+            "saved_at": datetime.now().strftime(DATETIME_FORMAT),
+            "modified_time": modified_time,
+        }
+        if write_manifest:
+            self.write_manifest()
+
+    def save_sheets(self, sheets, modified_time=None):
+        """
+        Saves all the given worksheets and marks the snapshot as checked.
+        :param sheets: a dictionary of worksheet name -> pandas DataFrame
+        :param modified_time: the Drive modifiedTime of the spreadsheet the worksheets were downloaded from
+        """
+        for sheet, df in sheets.items():
+            self.save_sheet(sheet, df, modified_time, write_manifest=False)
+        self.mark_checked(modified_time)
+
+    def mark_checked(self, modified_time=None):
+        """
+        Records that the snapshot was (re)validated against Google Drive now.
+        :param modified_time: the Drive modifiedTime of the spreadsheet, if known
+        """
+        if modified_time is not None:
+            self.manifest["modified_time"] = modified_time
+        self.manifest["checked_at"] = datetime.now().strftime(DATETIME_FORMAT)
+        self.write_manifest()
+
+    def age(self):
+        """
+        :return: the time passed since the snapshot was last checked, None if it was never checked.
+        """
+        if self.manifest["checked_at"] is None:
+            return None
+        return datetime.now() - datetime.strptime(
+            self.manifest["checked_at"], DATETIME_FORMAT
+        )
+
+    def is_stale(self, ttl: timedelta) -> bool:
+        age = self.age()
+        return age is None or age > ttl
+
+    def clear(self):
+        if self.path.is_dir():
+            shutil.rmtree(self.path)
+        self._manifest = None
@@ -0,0 +1,86 @@
+"""
+SYNOPSIS
+    python -m benchmarks.marc_041 [-h,--help] [--rows N]
+
+DESCRIPTION
+    Benchmarks marc.create_MARC_041 on a synthetic catalog, against the row by row (iterrows)
+    implementation it replaced, and checks that both create the same 041 and 008 columns.
+"""
+import argparse
+import random
+import timeit
+
+import pandas as pd
+
+from VC_collections.marc import create_MARC_041, create_MARC_initial_008
+
+LANGUAGE_MAPPER = {
+    "עברית": "heb",
+    "אנגלית": "eng",
+    "ערבית": "ara",
+    "יידיש": "yid",
+    "גרמנית": "ger",
+    "צרפתית": "fre",
+    "רוסית": "rus",
+}
+
+
+def create_MARC_041_iterrows(df, language_mapper):
+    """
+    the previous, row by row, implementation of create_MARC_041
+    """
+    language_mapper = {"קוד שפה": language_mapper}
+    for index, row in df.iterrows():
+        if row["שפה"] == "":
+            continue
+        languages = row["שפה"].split(";")
+        new_lang = ["$$a" + language_mapper["קוד שפה"][k] for k in languages]
+        df.loc[index, "041"] = "".join(new_lang)
+        field_008 = list(row["008"])
+        for i in range(35, 38):
+            field_008[i] = new_lang[0][i - 32]
+        df.loc[index, "008"] = "".join(field_008)
+    return df
+
+
+def create_catalog(rows):
+    random.seed(0)
+    languages = list(LANGUAGE_MAPPER)
+    df = pd.DataFrame(
+        {
+            "שפה": [
+                ";".join(random.sample(languages, random.randint(0, 3)))
+                for _ in range(rows)
+            ]
+        },
+        index=[f"ArBe-{i:06d}" for i in range(rows)],
+    )
+    return create_MARC_initial_008(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark create_MARC_041")
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    df = create_catalog(args.rows)
+    new_cols = ["041", "008"]
+
+    df_old = df.copy()
+    start = timeit.default_timer()
+    df_old = create_MARC_041_iterrows(df_old, LANGUAGE_MAPPER)
+    old_time = timeit.default_timer() - start
+
+    df_new = df.copy()
+    start = timeit.default_timer()
+    df_new = create_MARC_041(df_new, LANGUAGE_MAPPER)
+    new_time = timeit.default_timer() - start
+
+    print(f"{args.rows:,} rows")
+    print(f"iterrows:   {old_time:8.2f} seconds")
+    print(f"vectorized: {new_time:8.2f} seconds ({old_time / new_time:.0f}x)")
+    print(f"identical output: {df_old[new_cols].equals(df_new[new_cols])}")
+
+
+if __name__ == "__main__":
+    main()
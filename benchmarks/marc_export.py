@@ -0,0 +1,65 @@
+"""
+SYNOPSIS
+    python -m benchmarks.marc_export [-h,--help] [--records N] [--workers N]
+
+DESCRIPTION
+    Benchmarks the export of the final MARC files (Collection.create_marc_files) on a synthetic MARC
+    table: the run time and the file size of each format (xml, seq, mrc), each format on its own and
+    all of them in a single pass.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from VC_collections.Collection import Collection
+
+
+def create_marc_table(records):
+    return pd.DataFrame(
+        {
+            "LDR": ["LDR"] * records,
+            "008": ["######k###########xx######################d"] * records,
+            "040": ["$$bheb$$erda"] * records,
+            "245 0": [f"$$aתיק מספר {i}$$bתיאור התיק" for i in range(records)],
+            "351": ["$$cFile Record"] * records,
+            "520": [f"$$aתיאור תוכן של התיק {i}" for i in range(records)],
+            "650 7_1": ["$$aArchitecture$$zIsrael"] * records,
+            "700 1_1": [
+                "" if i % 3 else "$$aבסט, דוד$$eאדריכל$$9heb" for i in range(records)
+            ],
+        },
+        index=[f"99{i:012d}" for i in range(records)],
+    )
+
+
+def run(collection, formats, workers):
+    counter, run_time = collection.create_marc_files(formats, workers=workers)
+    sizes = ", ".join(
+        f"{format}: {collection.marc_file_path(format).stat().st_size:,} bytes"
+        for format in formats
+    )
+    print(f"{'+'.join(formats):<12} {run_time:8.2f} seconds   {sizes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MARC export formats")
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        collection = Collection.__new__(Collection)
+        collection.collection_id = "benchmark"
+        collection.dt_now = "00000000"
+        collection.data_path_processed = Path(path)
+        collection.marc_data = create_marc_table(args.records)
+
+        print(f"{args.records:,} records, {args.workers} worker(s)")
+        for formats in (("xml",), ("seq",), ("mrc",), ("xml", "seq", "mrc")):
+            run(collection, formats, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+SYNOPSIS
+    python -m benchmarks.split_creators [-h,--help] [--rows N]
+
+DESCRIPTION
+    Benchmarks authorities.split_creators_by_type on a synthetic catalog, against the row by row
+    (iterrows) implementation it replaced, and checks that both create the same
+    COMBINED_CREATORS_PERS and COMBINED_CREATORS_CORPS columns.
+"""
+import argparse
+import random
+import timeit
+
+import pandas as pd
+
+from VC_collections.authorities import find_role, split_creators_by_type
+
+ROLES_DICT = {
+    "pers_roles": ["אדריכל", "צלם", "מעצב", "מזמין", "כותב"],
+    "corps_roles": ["משרד אדריכלים", "מזמין", "הוצאה לאור", "מוסד"],
+}
+NAMES = ["בסט, דוד", "גד, דורה", "כרמי, דב", "Mendelsohn, Erich", "משרד כרמי", "עיריית חיפה"]
+
+
+def split_creators_by_type_iterrows(df, col_name, roles_dict):
+    """
+    the previous, row by row, implementation of split_creators_by_type
+    """
+    for index, row in df.iterrows():
+        add_pers_creators = []
+        add_corps_creators = []
+        for creator in str(row[col_name]).split(";"):
+            for k, v in roles_dict.items():
+                if find_role(creator) in v:
+                    if "pers" in k:
+                        add_pers_creators.append(creator)
+                    else:
+                        add_corps_creators.append(creator)
+
+        add_pers_creators = list(filter(None, add_pers_creators))
+        add_corps_creators = list(filter(None, add_corps_creators))
+
+        df.loc[index, "COMBINED_CREATORS_PERS"] = ";".join(add_pers_creators)
+        df.loc[index, "COMBINED_CREATORS_CORPS"] = ";".join(add_corps_creators)
+
+    return df
+
+
+def create_catalog(rows):
+    random.seed(0)
+    roles = sorted(set(ROLES_DICT["pers_roles"] + ROLES_DICT["corps_roles"])) + ["תפקיד"]
+    return pd.DataFrame(
+        {
+            "COMBINED_CREATORS": [
+                ";".join(
+                    f"{random.choice(NAMES)} [{random.choice(roles)}]"
+                    for _ in range(random.randint(0, 4))
+                )
+                for _ in range(rows)
+            ]
+        },
+        index=[f"ArBe-{i:06d}" for i in range(rows)],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark split_creators_by_type")
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    df = create_catalog(args.rows)
+    new_cols = ["COMBINED_CREATORS_PERS", "COMBINED_CREATORS_CORPS"]
+
+    df_old = df.copy()
+    start = timeit.default_timer()
+    df_old = split_creators_by_type_iterrows(df_old, "COMBINED_CREATORS", ROLES_DICT)
+    old_time = timeit.default_timer() - start
+
+    df_new = df.copy()
+    start = timeit.default_timer()
+    df_new = split_creators_by_type(df_new, "COMBINED_CREATORS", ROLES_DICT)
+    new_time = timeit.default_timer() - start
+
+    print(f"{args.rows:,} rows")
+    print(f"iterrows:   {old_time:8.2f} seconds")
+    print(f"vectorized: {new_time:8.2f} seconds ({old_time / new_time:.0f}x)")
+    print(f"identical output: {df_old[new_cols].equals(df_new[new_cols])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import sys
 import timeit
 
@@ -12,6 +13,7 @@ from VC_collections.fieldmapper import (
     final_fields_back_mapper,
     final_column_order,
 )
+from VC_collections.dates import clean_date_column, date_failures_report
 from VC_collections.logger import initialize_logger
 from VC_collections.marc import create_907_dict
 
@@ -579,8 +581,33 @@ def add_number_of_files(collection):
     return collection
 
 
-def main():
+def configure_parser():
+    my_parser = argparse.ArgumentParser(
+        description="Preprocess 1 - clean and validate the catalog"
+    )
+    my_parser.add_argument(
+        "--decisions",
+        help="batch mode: a decisions file (json, csv or xlsx) of error word -> new value for the "
+        "ACCESSRESTRICT, PUBLICATION_COUNTRY, ARCHIVAL_MATERIAL and MEDIUM_FORMAT checks, "
+        "instead of asking which new value to use",
+    )
+    my_parser.add_argument(
+        "--threshold",
+        type=int,
+        help="batch mode: the minimal similarity (0-100) for an automatic correction of a value "
+        "which has no decision (default 60)",
+    )
+    return my_parser
+
+
+def main(decisions_path=None, threshold=None):
     start_time = timeit.default_timer()
+    decisions = None
+    if decisions_path is not None:
+        decisions = read_correction_decisions(decisions_path)
+
+    def column_decisions(col_name):
+        return None if decisions is None else decisions.get(col_name, {})
 
     """ get branch and  collection ID to work on and create a Collection instance """
     # CMS, branch, collection_id = get_branch_colletionID()
@@ -641,6 +668,8 @@ def main():
         collection.full_catalog,
         "ACCESSRESTRICT",
         Authority_instance.privacy_search_dict,
+        decisions=column_decisions("ACCESSRESTRICT"),
+        threshold=threshold,
     )
 
     logger.info(
@@ -653,7 +682,9 @@ def main():
     collection.full_catalog = check_values_against_cvoc(
         collection.full_catalog,
         "PUBLICATION_COUNTRY",
-        Authority_instance.countries_mapping_dict
+        Authority_instance.countries_mapping_dict,
+        decisions=column_decisions("PUBLICATION_COUNTRY"),
+        threshold=threshold,
     )
 
     if "TO_DELETE" in list(collection.full_catalog.columns):
@@ -675,20 +706,26 @@ def main():
     if "final" in collection.google_sheet_file_name.lower():
         logger.info("[DATES] Validating dates")
         collection.full_catalog = check_date_columns(collection.full_catalog)
-        logger.info("[DATES] cleaning dates - start date")
-        collection.full_catalog["DATE_START"] = (
-            collection.full_catalog["DATE_START"]
-                .astype(str)
-                .replace(r"\.0$", "", regex=True)
-                .apply(clean_date_format)
-        )
-        logger.info("[DATES] cleaning dates - end date")
-        collection.full_catalog["DATE_END"] = (
-            collection.full_catalog["DATE_END"]
-                .astype(str)
-                .replace(r"\.0$", "", regex=True)
-                .apply(clean_date_format)
-        )
+        date_reports = list()
+        for date_col in ("DATE_START", "DATE_END"):
+            logger.info(f"[DATES] cleaning dates - {date_col}")
+            dates = (
+                collection.full_catalog[date_col]
+                    .astype(str)
+                    .replace(r"\.0$", "", regex=True)
+            )
+            collection.full_catalog[date_col], failures = clean_date_column(dates)
+            date_reports.append(date_failures_report(dates, failures))
+        df_date_report = pd.concat(date_reports)
+        if len(df_date_report) > 0:
+            date_report_filename = collection.data_path_reports / (
+                collection.collection_id + "_date_errors_" + collection.dt_now + ".xlsx"
+            )
+            logger.info(
+                f"[DATES] {len(df_date_report)} dates could not be normalized,"
+                f" file name: {date_report_filename}"
+            )
+            write_excel(df_date_report, date_report_filename, "date_errors")
 
     logger.info(
         f"[COMBINED_CREATORS] CREATING COMBINED CREATORS for {collection.collection_id} , at: {datetime.now()}"
@@ -713,6 +750,8 @@ def main():
         collection.full_catalog,
         "ARCHIVAL_MATERIAL",
         Authority_instance.arch_mat_search_dict,
+        decisions=column_decisions("ARCHIVAL_MATERIAL"),
+        threshold=threshold,
     )
     logger.info(f"[ARCHIVAL_MATERIAL] Creating Archival Material Match File")
     create_match_file(
@@ -728,6 +767,8 @@ def main():
             collection.full_catalog,
             "MEDIUM_FORMAT",
             Authority_instance.media_format_mapping_dict,
+            decisions=column_decisions("MEDIUM_FORMAT"),
+            threshold=threshold,
         )
         logger.info(f"[MEDIUM_FORMAT] Creating Media/Format Match File")
         create_match_file(
@@ -785,8 +826,9 @@ def main():
 
 
 if __name__ == "__main__":
+    args = configure_parser().parse_args()
     while True:
-        main()
+        main(decisions_path=args.decisions, threshold=args.threshold)
         batch = input("Run another collection through Preprocess-1? (Y/N) ")
         if batch.strip().lower() != "y":
             sys.stdout.write("Ending run!")
@@ -1,3 +1,4 @@
+import argparse
 import sys
 import time
 import timeit
@@ -21,7 +22,29 @@ def is_collection_postprocess1(collection):
         return False
 
 
-def main():
+def configure_parser():
+    my_parser = argparse.ArgumentParser(
+        description="Preprocess 2 - create the final MARC files"
+    )
+    my_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="the number of processes to serialize the MARC records in (default 1). "
+        "The output is identical for any number of workers",
+    )
+    my_parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=["xml", "seq", "mrc"],
+        default=["xml", "seq"],
+        help="the formats of the final MARC files: xml (MARC XML), seq (MARC sequential file "
+        "for Aleph), mrc (binary MARC21). All the formats are written in a single pass",
+    )
+    return my_parser
+
+
+def main(workers=1, formats=("xml", "seq")):
     start_time = timeit.default_timer()
     collection = retrieve_collection()
 
@@ -157,12 +180,25 @@ def main():
         "[MARC 260/008 DATES] Creating  MARC 260 $g $e - DATE (free text), and publication country."
         " Updates MARC 008"
     )
-    collection.df_final_data = marc.create_MARC_260_008_date(
+    collection.df_final_data, df_date_report = marc.create_MARC_260_008_date(
         collection.df_final_data,
         "תאריך מנורמל מוקדם",
         "תאריך מנורמל מאוחר",
         "תאריך חופשי",
+        report=True,
     )
+    if len(df_date_report) > 0:
+        date_report_filename = collection.data_path_reports / (
+            collection.collection_id
+            + "_marc_date_errors_"
+            + collection.dt_now
+            + ".xlsx"
+        )
+        logger.info(
+            f"[MARC 260/008 DATES] {len(df_date_report)} dates could not be normalized,"
+            f" file name: {date_report_filename}"
+        )
+        write_excel(df_date_report, date_report_filename, "date_errors")
 
     # create 260 (DATE fields, and PUBLICATION_COUNTRY) (מדינת פרסום, תאריך מנורמל מוקדם, תאריך מנורמל מאוחר)
     logger.info(
@@ -226,10 +262,7 @@ def main():
     # create 336
     logger.info("[MARC 336] Creating MARC RDA 336 ")
 
-    collection.df_final_data, df_explode_336 = marc.create_MARC_336(
-        collection.df_final_data
-    )
-    df2 = pd.concat([collection.df_final_data, df_explode_336], axis=1)
+    collection.df_final_data, _ = marc.create_MARC_336(collection.df_final_data)
 
     # create 337 338
     logger.info("[MARC 337/338] Creating MARC RDA 337/338 ")
@@ -279,9 +312,10 @@ def main():
         r"\\n", " ", regex=True
     ).replace("  ", " ", regex=True)
 
-    # create MARC Catalog
-    marc.export_MARCXML_final_table(collection)
-    collection.create_marc_seq_file()
+    # create MARC Catalog - MARC XML and MARC sequential files (by default), in a single pass
+    marc.export_MARCXML_final_table(
+        collection, formats=tuple(formats), workers=workers
+    )
 
     #
 
@@ -298,8 +332,9 @@ def main():
 
 
 if __name__ == "__main__":
+    args = configure_parser().parse_args()
     while True:
-        main()
+        main(workers=args.workers, formats=args.formats)
         batch = input("Run another collection through Preprocess-2? (Y/N)")
         if batch.lower() != "y":
             sys.stdout.write("Ending run!")
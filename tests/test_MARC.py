@@ -5,44 +5,211 @@ import pandas as pd
 
 class Test_MARC(TestCase):
     def test_create_MARC_921_933(self):
+        from VC_collections import AuthorityFiles
+        from VC_collections.AuthorityFiles import Authority
+        from VC_collections.marc import create_MARC_921_933
+
+        authority = Authority(offline=True)
+        authority._worksheets["שם הרושם"] = pd.DataFrame(
+            {
+                "שם הרושם": ["יובל עציוני", "צליל ניב", "רושם ללא קוד"],
+                "קיצור אלף": ["YE", "TN", "nan"],
+            }
+        )
+        AuthorityFiles._authority = authority
         test_df = pd.DataFrame(
             {
-                "תאריך הרישום": {
-                    "997007810681405171": "2020-01-26 15:56",
-                    "997007810681305171": "2019-11-25 13:06",
-                    "997007810681205171": "2019-11-25 13:41",
-                    "997007810681105171": "2019-11-25 16:15",
-                    "997007810681005171": "2019-11-25 13:06",
-                    "997007810680905171": "2019-11-21 8:59",
-                    "997007810680805171": "2019-11-25 15:09",
-                    "997007810680705171": "2019-11-25 17:52",
-                    "997007810680605171": "2019-11-25 17:53",
-                    "997007810680505171": "2019-11-25 17:53",
-                    "997007810680405171": "2019-12-18 16:20",
-                    "997007810680305171": "2019-12-18 16:24",
-                    "997007810680205171": "2019-12-18 16:24",
-                    "997007810680105171": "2019-12-18 16:25",
-                },
-                "שם הרושם": {
-                    "997007810681405171": "יובל עציוני;צליל ניב",
-                    "997007810681305171": "יובל עציוני",
-                    "997007810681205171": "יובל עציוני",
-                    "997007810681105171": "יובל עציוני",
-                    "997007810681005171": "יובל עציוני",
-                    "997007810680905171": "יובל עציוני",
-                    "997007810680805171": "יובל עציוני",
-                    "997007810680705171": "יובל עציוני",
-                    "997007810680605171": "יובל עציוני",
-                    "997007810680505171": "יובל עציוני",
-                    "997007810680405171": "יובל עציוני",
-                    "997007810680305171": "יובל עציוני",
-                    "997007810680205171": "יובל עציוני",
-                    "997007810680105171": "יובל עציוני",
+                "תאריך הרישום": [
+                    "2020-01-26 15:56",
+                    "25/11/2019",
+                    "2019-11",
+                    "11/25/2019 13:06:00",
+                    "2019-12-18",
+                    "2019-12-18 16:24",
+                ],
+                "שם הרושם": [
+                    "יובל עציוני;צליל ניב",
+                    "[];צליל ניב",
+                    "צליל ניב",
+                    "משה זר;צליל ניב;יובל עציוני",
+                    "רושם ללא קוד",
+                    "יובל עציוני;רושם ללא קוד",
+                ],
+            },
+            index=[
+                "997007810681405171",
+                "997007810681305171",
+                "997007810681205171",
+                "997007810681105171",
+                "997007810681005171",
+                "997007810680905171",
+            ],
+        )
+        try:
+            df = create_MARC_921_933(test_df)
+        finally:
+            AuthorityFiles.reset_authority()
+
+        self.assertEqual(
+            df["921"].tolist(),
+            [
+                "$$aYE 202001",
+                "$$aTN 201911",
+                "$$aTN 201911",
+                "$$anan 201911",
+                "$$anan 201912",
+                "$$aYE 201912",
+            ],
+        )
+        self.assertEqual(
+            df["933_1"].tolist(),
+            ["$$aTN 202001", "$$aTN 201911", "", "$$aTN 201911", "", "nan"],
+        )
+        self.assertEqual(df["933_2"].tolist(), ["", "", "", "$$aYE 201911", "", ""])
+        self.assertNotIn("933", df.columns)
+
+    def test_create_marc_041(self):
+        from VC_collections.marc import create_MARC_041, create_MARC_initial_008
+
+        test_df = create_MARC_initial_008(
+            pd.DataFrame(
+                {"שפה": ["עברית;אנגלית", "", "קלינגונית;ערבית", "קלינגונית"]},
+                index=["ArBe-1", "ArBe-2", "ArBe-3", "ArBe-4"],
+            )
+        )
+        language_mapper = {"עברית": "heb", "אנגלית": "eng", "ערבית": "ara"}
+        df, df_report = create_MARC_041(test_df, language_mapper, report=True)
+
+        self.assertEqual(
+            df["041"].fillna("").tolist(), ["$$aheb$$aeng", "", "$$aara", ""]
+        )
+        self.assertEqual(df["008"].str[35:38].tolist(), ["heb", "###", "ara", "###"])
+        self.assertEqual(list(df_report.index), ["ArBe-3", "ArBe-4"])
+        self.assertEqual(df_report["language"].tolist(), ["קלינגונית", "קלינגונית"])
+
+    def test_create_marc_041_code_width(self):
+        from VC_collections.field008 import FIELD_008_TEMPLATE
+        from VC_collections.marc import create_MARC_041, create_MARC_initial_008
+
+        test_df = create_MARC_initial_008(
+            pd.DataFrame({"שפה": ["עברית", "ערבית;עברית", "יידיש"]})
+        )
+        language_mapper = {"עברית": "heb ", "ערבית": "ar", "יידיש": "yidd"}
+        df = create_MARC_041(test_df, language_mapper)
+
+        self.assertEqual(
+            df["008"].tolist(),
+            [
+                FIELD_008_TEMPLATE[:35] + code + FIELD_008_TEMPLATE[38:]
+                for code in ["heb", "ar#", "yid"]
+            ],
+        )
+
+    def test_create_marc_336(self):
+        from VC_collections import AuthorityFiles
+        from VC_collections.AuthorityFiles import Authority
+        from VC_collections.marc import create_MARC_336, create_MARC_initial_008
+
+        still_image = "$$astill image$$bsti$$2rdacontent"
+        text = "$$atext$$btxt$$2rdacontent"
+        cartographic_image = "$$acartographic image$$bcri$$2rdacontent"
+        authority = Authority(offline=True)
+        authority.__dict__["arch_mat_map_336"] = {
+            "צילומים": still_image,
+            "מכתבים": text,
+            "תשריטים": cartographic_image,
+        }
+        AuthorityFiles._authority = authority
+        test_df = create_MARC_initial_008(
+            pd.DataFrame(
+                {
+                    "סוג חומר": [
+                        "צילומים",
+                        "צילומים;מכתבים",
+                        "מכתבים; מכתבים",
+                        "תשריטים",
+                    ]
                 },
-            }
+                index=["ArBe-1", "ArBe-2", "ArBe-3", "ArBe-4"],
+            )
+        )
+        try:
+            df, df_explode_336 = create_MARC_336(test_df)
+        finally:
+            AuthorityFiles.reset_authority()
+
+        self.assertEqual(
+            df["008"].tolist(),
+            [
+                "######k###########xx###############zxx####d",
+                "######k###########xx######################d",
+                "######k###########xx######################d",
+                "######k###########xx######################d",
+            ],
+        )
+        self.assertEqual(list(df_explode_336.columns), ["336_1", "336_2"])
+        self.assertEqual(
+            df["336_1"].tolist(), [still_image, still_image, text, cartographic_image]
+        )
+        self.assertEqual(df["336_2"].tolist(), ["", text, "", ""])
+        self.assertNotIn("סוג חומר", df.columns)
+
+    def test_create_marc_260_044_008_countries(self):
+        from VC_collections.marc import (
+            create_MARC_260_044_008_countries,
+            create_MARC_initial_008,
+        )
+
+        test_df = create_MARC_initial_008(
+            pd.DataFrame(
+                {"מדינת הפרסום/הצילום": ["ישראל;גרמניה", "", "ארצות הברית"]},
+                index=["ArBe-1", "ArBe-2", "ArBe-3"],
+            )
+        )
+        test_df["260"] = "$$g1950"
+        countries_code_mapper = {"ישראל": "is", "גרמניה": "gw", "ארצות הברית": "xxu"}
+        df = create_MARC_260_044_008_countries(
+            test_df, "מדינת הפרסום/הצילום", countries_code_mapper
+        )
+
+        self.assertEqual(
+            df["260"].tolist(),
+            ["$$g1950$$e[ישראל]$$e[גרמניה]", "$$g1950", "$$g1950$$e[ארצות הברית]"],
+        )
+        self.assertEqual(df["044"].fillna("").tolist(), ["$$ais$$agw", "", "$$axxu"])
+        self.assertEqual(
+            df["008"].tolist(),
+            [
+                "######k###########is######################d",
+                "######k###########xx######################d",
+                "######k###########xxu#####################d",
+            ],
         )
 
+        test_df.loc["ArBe-2", "מדינת הפרסום/הצילום"] = "מאדים"
+        with self.assertRaises(SystemExit):
+            create_MARC_260_044_008_countries(
+                test_df, "מדינת הפרסום/הצילום", countries_code_mapper
+            )
+
+    def test_create_marc_260_044_008_countries_code_width(self):
+        from VC_collections.marc import (
+            create_MARC_260_044_008_countries,
+            create_MARC_initial_008,
+        )
 
+        test_df = create_MARC_initial_008(
+            pd.DataFrame({"מדינת הפרסום/הצילום": ["ישראל", "אנגליה", "גרמניה"]})
+        )
+        test_df["260"] = ""
+        countries_code_mapper = {"ישראל": "is ", "אנגליה": "xxk1", "גרמניה": "g"}
+        with self.assertLogs("VC_collections.marc", level="ERROR"):
+            df = create_MARC_260_044_008_countries(
+                test_df, "מדינת הפרסום/הצילום", countries_code_mapper
+            )
+
+        self.assertEqual(df["008"].str[18:21].tolist(), ["is#", "xxk", "g##"])
+        self.assertTrue((df["008"].str.len() == 43).all())
 
     def test_check_date_values_in_row(self):
         from VC_collections.marc import extract_years_from_text
@@ -50,18 +217,40 @@ class Test_MARC(TestCase):
         self.assertEqual(extract_years_from_text("1930/1990"), ["1930", "1990"])
         self.assertEqual(extract_years_from_text("[בערך 1940-2018]"), ["1940", "2018"])
 
-    def test_create_marc_999_values_list(self):
-        from VC_collections.marc import create_MARC_999_values_list
+    def test_create_marc_655_999(self):
+        from VC_collections import AuthorityFiles
+        from VC_collections.AuthorityFiles import Authority
+        from VC_collections.marc import create_MARC_655
+
+        terms = ["תצלומים", "שמע", "תשריט", "מפת מדידה", "מפה (תשריט)", "מכתבים"]
+        authority = Authority(offline=True)
+        authority.__dict__["_archival_material"] = (
+            None,
+            None,
+            {term: f"$$a{term}$$2aat" for term in terms},
+            None,
+        )
+        AuthorityFiles._authority = authority
+        test_df = pd.DataFrame(
+            {"סוג חומר": ["תצלומים;שמע;תשריט;מפת מדידה", "מכתבים", "מפה (תשריט)"]},
+            index=["ArBe-1", "ArBe-2", "ArBe-3"],
+        )
+        try:
+            df = create_MARC_655(test_df)
+        finally:
+            AuthorityFiles.reset_authority()
 
-        list_999_values_test = ["תצלומים", "שמע", "תשריט", "מפת מדידה"]
         self.assertEqual(
-            create_MARC_999_values_list(list_999_values_test),
+            df[["999_4", "999_5", "999_6"]].values.tolist(),
             [
-                "$$aAUDIO FILE (AUDIO FILE)",
-                "$$aPHOTOGRAPH (PHOTOGRAPH)",
-                "$$aMAP (MAP)",
+                ["$$aPHOTOGRAPH", "$$aAUDIO FILE", "$$aMAP"],
+                ["", "", ""],
+                ["$$aMAP", "", ""],
             ],
         )
+        self.assertEqual(
+            df["655 7_2"].tolist(), ["$$aשמע$$2aat", "", "$$aתשריט$$2aat"]
+        )
 
     def test_create_710_current_owner_val(self):
         from VC_collections.marc import create_710_current_owner_val
@@ -0,0 +1,64 @@
+from unittest import TestCase, main
+
+
+class TestAuthorities(TestCase):
+    def test_split_creators_by_type(self):
+        import pandas as pd
+        from VC_collections.authorities import split_creators_by_type
+
+        roles_dict = {
+            "pers_roles": ["אדריכל", "צלם", "מזמין"],
+            "corps_roles": ["משרד אדריכלים", "מזמין"],
+        }
+        df = pd.DataFrame(
+            {
+                "COMBINED_CREATORS": [
+                    "בסט, דוד [אדריכל];עיריית חיפה [מזמין];כרמי, דב [נהג]",
+                    "משרד כרמי [משרד אדריכלים]",
+                    "",
+                ]
+            },
+            index=["ArBe-1", "ArBe-2", "ArBe-3"],
+        )
+        df = split_creators_by_type(df, "COMBINED_CREATORS", roles_dict)
+        self.assertEqual(
+            df["COMBINED_CREATORS_PERS"].tolist(),
+            ["בסט, דוד [אדריכל];עיריית חיפה [מזמין]", "", ""],
+        )
+        self.assertEqual(
+            df["COMBINED_CREATORS_CORPS"].tolist(),
+            ["עיריית חיפה [מזמין]", "משרד כרמי [משרד אדריכלים]", ""],
+        )
+
+    def test_check_values_against_cvoc_batch(self):
+        import pandas as pd
+        from VC_collections.authorities import check_values_against_cvoc
+
+        new_values = {
+            "מכתבים": "מכתבים;מכתב",
+            "צילומים": "צילומים;צילום",
+            "תצלומים": "תצלומים;צילום",
+        }
+        df = pd.DataFrame({"ARCHIVAL_MATERIAL": ["מכתב;צילום", "מכתבים", "ספרים"]})
+        df = check_values_against_cvoc(
+            df, "ARCHIVAL_MATERIAL", new_values, decisions={"צילום": "תצלומים"}
+        )
+        self.assertEqual(
+            df["ARCHIVAL_MATERIAL"].tolist(), ["מכתבים;תצלומים", "מכתבים", "ספרים"]
+        )
+
+    def test_check_values_against_cvoc_threshold(self):
+        import pandas as pd
+        from VC_collections.authorities import check_values_against_cvoc
+
+        new_values = {"צילומים": "צילומים;צילום", "תצלומים": "תצלומים;צילום"}
+        df = pd.DataFrame({"ARCHIVAL_MATERIAL": ["צילום;תצלומם", "צילומים"]})
+        # צילום has two possible new values - it is left as is instead of asking
+        df = check_values_against_cvoc(df, "ARCHIVAL_MATERIAL", new_values, threshold=80)
+        self.assertEqual(
+            df["ARCHIVAL_MATERIAL"].tolist(), ["צילום;תצלומים", "צילומים"]
+        )
+
+
+if __name__ == "__main__":
+    main()
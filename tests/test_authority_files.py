@@ -0,0 +1,240 @@
+from unittest import TestCase
+
+
+class TestAuthorityRegistry(TestCase):
+    def tearDown(self):
+        from VC_collections.AuthorityFiles import reset_authority
+
+        reset_authority()
+
+    def test_authority_is_loaded_once(self):
+        from VC_collections import AuthorityFiles
+
+        AuthorityFiles.reset_authority()
+        authority = AuthorityFiles.get_authority()
+        self.assertIs(AuthorityFiles.get_authority(), authority)
+        self.assertEqual(
+            AuthorityFiles.Authority_instance.SNAPSHOT_PATH, authority.SNAPSHOT_PATH
+        )
+        self.assertEqual(AuthorityFiles.authority_stats["instances"], 1)
+
+    def test_worksheet_stats(self):
+        import pandas as pd
+        from VC_collections import AuthorityFiles
+        from VC_collections.AuthorityFiles import Authority
+
+        AuthorityFiles.reset_authority()
+        authority = Authority(offline=True)
+        authority._worksheets["שפה"] = pd.DataFrame({"שפה": ["עברית"]})
+        for _ in range(3):
+            authority.worksheet("שפה")
+        self.assertEqual(
+            AuthorityFiles.authority_stats, {"instances": 0, "loads": 0, "hits": 3}
+        )
+        AuthorityFiles.reset_authority()
+
+    def test_worksheet_stats_of_snapshot_and_download(self):
+        import tempfile
+        import unittest.mock
+        from pathlib import Path
+
+        import pandas as pd
+        from VC_collections import AuthorityFiles
+        from VC_collections.AuthorityFiles import AUTHORITY_SPREADSHEET_ID, Authority
+        from VC_collections.snapshot import SnapshotStore
+
+        AuthorityFiles.reset_authority()
+        df = pd.DataFrame({"שפה": ["עברית"], "קוד שפה": ["heb"]})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            snapshot = SnapshotStore(Path(temp_dir), AUTHORITY_SPREADSHEET_ID)
+            snapshot.save_sheets({"שפה": df}, "2020-10-01T10:00:00.000Z")
+
+            authority = Authority(offline=False)
+            authority.snapshot = snapshot
+            authority.worksheet("שפה")
+            self.assertEqual(AuthorityFiles.authority_stats["hits"], 1)
+
+            authority = Authority(offline=False, refresh=True)
+            authority.snapshot = snapshot
+            authority._remote_available = True
+            worksheet = unittest.mock.Mock()
+            worksheet.get_all_records.return_value = df.to_dict("records")
+            authority._spreadsheet = unittest.mock.Mock()
+            authority._spreadsheet.worksheet.return_value = worksheet
+            authority.worksheet("שפה")
+            authority.worksheet("שפה")
+        self.assertEqual(
+            AuthorityFiles.authority_stats, {"instances": 0, "loads": 1, "hits": 2}
+        )
+        AuthorityFiles.reset_authority()
+
+
+class TestRelatorIndex(TestCase):
+    def setUp(self):
+        import pandas as pd
+        from VC_collections.AuthorityFiles import Authority
+
+        self.authority = Authority(offline=True)
+        self.authority._worksheets["סוגי אישים-תפקידים"] = pd.DataFrame(
+            {
+                "מילות מפתח - סוגי אישים בפרוייקט": ["אדריכל", "צלם", "מזמין"],
+                "RELATOR_HEB": ["אדריכל", "צלם", "מזמין"],
+                "RELATOR_ENG": ["architect", "photographer", "patron"],
+            }
+        )
+        self.authority._worksheets["סוגי ארגונים-תפקידים"] = pd.DataFrame(
+            {
+                "סוגי ארגונים": ["משרד אדריכלים", "מזמין"],
+                "RELATOR_HEB": ["אדריכל", "מזמין"],
+                "RELATOR_ENG": ["architect", "commissioning body"],
+            }
+        )
+
+    def test_relator_index(self):
+        from VC_collections.authorities import (
+            creator_kinds,
+            lookup_relator,
+            map_role_to_relator,
+        )
+
+        relator_index = self.authority.relator_index
+        self.assertEqual(set(relator_index["מזמין"]), {"PERS", "CORPS"})
+        self.assertEqual(set(relator_index["משרד אדריכלים"]), {"CORPS"})
+
+        kinds = creator_kinds("בסט, דוד [צלם]", relator_index)
+        self.assertEqual(list(kinds), ["PERS"])
+        for lang in ("heb", "eng", "lat", "cyr"):
+            self.assertEqual(
+                lookup_relator(kinds["PERS"], lang),
+                map_role_to_relator("צלם", self.authority.df_creator_pers_role, lang),
+            )
+        self.assertEqual(creator_kinds("בסט, דוד [נהג]", relator_index), {})
+
+    def test_parse_creator(self):
+        from VC_collections import AuthorityFiles
+        from VC_collections.authorities import parse_creator
+
+        AuthorityFiles.reset_authority()
+        parse_creator.cache_clear()
+        try:
+            for _ in range(2):
+                creator = parse_creator("בסט, דוד [צלם]")
+                self.assertEqual(creator.name, "בסט, דוד")
+                self.assertEqual(creator.role, "צלם")
+                self.assertEqual(creator.lang, "heb")
+            self.assertEqual(parse_creator("Best, David [מזמין]").lang, "lat")
+            self.assertEqual(parse_creator.cache_info().hits, 1)
+            self.assertEqual(parse_creator.cache_info().misses, 2)
+            # parsing a name does not load the Authority files
+            self.assertEqual(AuthorityFiles.authority_stats["instances"], 0)
+        finally:
+            parse_creator.cache_clear()
+
+    def test_creator_relator(self):
+        from VC_collections import AuthorityFiles
+        from VC_collections.authorities import creator_kinds, creator_relator
+
+        AuthorityFiles._authority = self.authority
+        try:
+            self.assertEqual(list(creator_kinds("בסט, דוד [צלם]")), ["PERS"])
+            self.assertEqual(creator_relator("בסט, דוד [צלם]"), "צלם")
+            self.assertEqual(
+                list(creator_kinds("Best, David [מזמין]")), ["PERS", "CORPS"]
+            )
+            self.assertEqual(creator_relator("Best, David [מזמין]"), "patron")
+            self.assertEqual(creator_relator("Best, David [מזמין]", "heb"), "מזמין")
+            self.assertIsNone(creator_relator("בסט, דוד [נהג]"))
+        finally:
+            AuthorityFiles.reset_authority()
+
+        # the relator is looked up in the current Authority, not in a cached result
+        AuthorityFiles._authority = self.authority
+        self.authority.__dict__["relator_index"] = {}
+        try:
+            self.assertIsNone(creator_relator("בסט, דוד [צלם]"))
+        finally:
+            AuthorityFiles.reset_authority()
+
+
+class UnreachableClient:
+    def request(self, *args, **kwargs):
+        raise ConnectionError("Google Drive is unreachable")
+
+
+class UnreachableSpreadsheet:
+    def worksheet(self, sheet):
+        raise ConnectionError("Google Sheets is unreachable")
+
+
+class TestAuthoritySnapshotFallback(TestCase):
+    def setUp(self):
+        import tempfile
+        from pathlib import Path
+
+        import pandas as pd
+        from VC_collections.AuthorityFiles import AUTHORITY_SPREADSHEET_ID
+        from VC_collections.snapshot import SnapshotStore
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame({"שפה": ["עברית"], "קוד שפה": ["heb"]})
+        self.snapshot = SnapshotStore(
+            Path(self.temp_dir.name) / "snapshot", AUTHORITY_SPREADSHEET_ID
+        )
+        self.snapshot.save_sheets({"שפה": self.df}, "2020-10-01T10:00:00.000Z")
+        # a stale snapshot, which must be re-validated against Google Drive
+        self.snapshot.manifest["checked_at"] = "2020-10-02T10:00:00"
+        self.snapshot.write_manifest()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def unreachable_authority(self):
+        from VC_collections.AuthorityFiles import Authority
+
+        authority = Authority(offline=False)
+        authority.snapshot = self.snapshot
+        authority._client = UnreachableClient()
+        authority._spreadsheet = UnreachableSpreadsheet()
+        return authority
+
+    def test_failed_check_loads_the_snapshot(self):
+        authority = self.unreachable_authority()
+
+        self.assertTrue(authority.worksheet("שפה").equals(self.df))
+        self.assertFalse(authority.check_remote())
+        # a failed check is not recorded as a validation of the snapshot
+        self.assertEqual(self.snapshot.manifest["checked_at"], "2020-10-02T10:00:00")
+        self.assertEqual(
+            self.snapshot.manifest["modified_time"], "2020-10-01T10:00:00.000Z"
+        )
+
+    def test_failed_download_loads_the_snapshot(self):
+        authority = self.unreachable_authority()
+        # Drive reports a newer version, but the worksheets cannot be downloaded
+        authority._remote_available = True
+        self.snapshot.manifest["modified_time"] = "2020-10-03T10:00:00.000Z"
+
+        self.assertTrue(authority.worksheet("שפה").equals(self.df))
+
+    def test_refresh_without_modified_time(self):
+        authority = self.unreachable_authority()
+        authority.refresh = True
+
+        # a refresh does not fall back to the snapshot
+        with self.assertRaises(SystemExit):
+            authority.worksheet("שפה")
+        self.assertNotIn("שפה", authority._worksheets)
+
+    def test_refresh_with_failed_download(self):
+        authority = self.unreachable_authority()
+        authority.refresh = True
+        authority._remote_available = True
+
+        with self.assertRaises(SystemExit):
+            authority.worksheet("שפה")
+
+    def test_failed_download_without_snapshot(self):
+        authority = self.unreachable_authority()
+
+        with self.assertRaises(ConnectionError):
+            authority.worksheet("שם הרושם")
@@ -1,3 +1,4 @@
+import unittest.mock
 from unittest import TestCase, main
 
 
@@ -90,6 +91,206 @@ class TestCollection(TestCase):
             in map_field_names_to_english(test_column_names, FM.catalog_field_mapper)
         )
 
+    def test_records_from_values(self):
+        from VC_collections.Collection import records_from_values
+
+        values = [["סימול", "כותרת", "תאריך"], ["ArBe-001", "מכתב", "1950"], ["ArBe-002"]]
+        self.assertEqual(
+            records_from_values(values),
+            [
+                {"סימול": "ArBe-001", "כותרת": "מכתב", "תאריך": 1950},
+                {"סימול": "ArBe-002", "כותרת": "", "תאריך": ""},
+            ],
+        )
+        self.assertEqual(records_from_values([]), [])
+
+    def test_from_file(self):
+        import tempfile
+        from pathlib import Path
+        from VC_collections.Collection import Collection
+        from tests.test_data import df_credits_data_without_owner_test
+
+        with tempfile.TemporaryDirectory() as base_path:
+            collection = Collection.from_file(
+                Path(__file__).parent / "Resources" / "ArBe_test_data.xlsx",
+                "Architect",
+                "ArBe",
+                base_path=base_path,
+                df_credits=df_credits_data_without_owner_test,
+            )
+            self.assertIsNone(collection.google_sheet_file_id)
+            self.assertIn("קטלוג סופי", collection.dfs)
+            self.assertEqual(len(collection.df_catalog), len(collection.dfs["קטלוג"]))
+            self.assertEqual(
+                len(collection.full_catalog),
+                len(collection.df_catalog) + len(collection.df_collection),
+            )
+            self.assertEqual(collection.df_final_data.index.name, "mms_id")
+
+    def test_parse_marc_column(self):
+        from VC_collections.Collection import parse_marc_column, marc_subfields
+
+        marc_column = parse_marc_column("650 7_2")
+        self.assertEqual(marc_column.tag, "650")
+        self.assertEqual(marc_column.indicators, [" ", "7"])
+        self.assertEqual(marc_column.code, "650 7")
+        self.assertEqual(marc_column.kind, "data")
+        self.assertEqual(parse_marc_column("LDR").kind, "leader")
+        self.assertEqual(parse_marc_column("008").kind, "control")
+        self.assertEqual(
+            marc_subfields("$$aTitle$$bSubtitle"), ["a", "Title", "b", "Subtitle"]
+        )
+
+    def test_serialize_marc_shards(self):
+        import pandas as pd
+        from VC_collections.Collection import (
+            serialize_marc_shard,
+            split_to_shards,
+        )
+
+        df = pd.DataFrame(
+            {
+                "LDR": [""] * 5,
+                "245 0": [f"$$aTitle {i}" for i in range(5)],
+                "650 7_1": ["$$aArchitecture$$zIsrael", "", "", "$$aDance", ""],
+            },
+            index=[f"id{i}" for i in range(5)],
+        )
+        shards = split_to_shards(df, 2)
+        self.assertEqual([len(shard) for shard in shards], [2, 3])
+        serialized = [serialize_marc_shard(shard) for shard in shards]
+        self.assertEqual(
+            b"".join(shard["seq"] for shard in serialized),
+            serialize_marc_shard(df)["seq"],
+        )
+        self.assertIn(b"id3 650 7 $$aDance\n", serialize_marc_shard(df)["seq"])
+
+    def test_create_marc_files_workers(self):
+        import tempfile
+        from pathlib import Path
+
+        import pandas as pd
+        from pymarc import MARCReader, parse_xml_to_array
+        from VC_collections.Collection import Collection
+
+        records = 23
+        df = pd.DataFrame(
+            {
+                "LDR": [""] * records,
+                "008": ["######k###########is######################d"] * records,
+                "245 0": [f"$$aכותרת {i}$$bTitle {i}" for i in range(records)],
+                "650 7_1": ["$$aאדריכלות$$2NLI", "", "$$aDance"] * 7 + ["", ""],
+            },
+            index=[f"99700{i}" for i in range(records)],
+        )
+        formats = ("xml", "seq", "mrc")
+
+        with tempfile.TemporaryDirectory() as base_path:
+            files = {}
+            for workers in (1, 3):
+                collection = Collection.__new__(Collection)
+                collection.marc_data = df
+                collection.collection_id = "ArBe"
+                collection.dt_now = f"workers_{workers}"
+                collection.data_path_processed = Path(base_path)
+                counter, _ = collection.create_marc_files(formats, workers=workers)
+                self.assertEqual(counter, records + 1)
+                files[workers] = {
+                    format: collection.marc_file_path(format).read_bytes()
+                    for format in formats
+                }
+
+            for format in formats:
+                self.assertEqual(files[1][format], files[3][format])
+
+            with open(collection.marc_file_path("mrc"), "rb") as f:
+                mrc_records = list(MARCReader(f, to_unicode=True, force_utf8=True))
+            xml_records = parse_xml_to_array(str(collection.marc_file_path("xml")))
+
+        self.assertEqual(len(mrc_records), records)
+        self.assertEqual(len(xml_records), records)
+        for mrc_record, xml_record, (index, row) in zip(
+            mrc_records, xml_records, df.iterrows()
+        ):
+            for record in (mrc_record, xml_record):
+                self.assertEqual(record["001"].data, index)
+                self.assertEqual(record["008"].data, row["008"])
+                self.assertEqual(record["245"]["a"], row["245 0"][3:].split("$$")[0])
+                self.assertEqual(
+                    len(record.get_fields("650")), int(row["650 7_1"] != "")
+                )
+
+    def test_fetch_catalog_cache(self):
+        import tempfile
+
+        from VC_collections.Collection import fetch_catalog
+
+        with tempfile.TemporaryDirectory() as cache_path:
+            client = FakeCatalogClient("2020-10-01T10:00:00.000Z")
+            dfs = fetch_catalog(client, "catalog-id", cache_path)
+            self.assertEqual(client.downloads, 1)
+            self.assertEqual(list(dfs), ["קטלוג", "אוסף"])
+            self.assertEqual(dfs["קטלוג"]["כותרת"].tolist(), ["מכתב 1"])
+
+            # hit - the same version of the spreadsheet is loaded from the cache
+            dfs = fetch_catalog(client, "catalog-id", cache_path)
+            self.assertEqual(client.downloads, 1)
+            self.assertEqual(dfs["קטלוג"]["כותרת"].tolist(), ["מכתב 1"])
+
+            # miss - a modified spreadsheet is downloaded again
+            client.modified_time = "2020-10-02T10:00:00.000Z"
+            dfs = fetch_catalog(client, "catalog-id", cache_path)
+            self.assertEqual(client.downloads, 2)
+            self.assertEqual(dfs["קטלוג"]["כותרת"].tolist(), ["מכתב 2"])
+
+            # hit - without a modifiedTime, the latest cached version is loaded
+            client.modified_time = None
+            dfs = fetch_catalog(client, "catalog-id", cache_path)
+            self.assertEqual(client.downloads, 2)
+            self.assertEqual(dfs["קטלוג"]["כותרת"].tolist(), ["מכתב 2"])
+
+        with tempfile.TemporaryDirectory() as cache_path:
+            # nothing cached and no modifiedTime - the spreadsheet is downloaded
+            client = FakeCatalogClient(None)
+            fetch_catalog(client, "catalog-id", cache_path)
+            self.assertEqual(client.downloads, 1)
+
+
+class FakeCatalogClient:
+    """
+    A gspread client of a single catalog spreadsheet, which counts its downloads.
+    """
+
+    def __init__(self, modified_time):
+        self.modified_time = modified_time
+        self.downloads = 0
+
+    def request(self, method, url, params=None):
+        if self.modified_time is None:
+            raise ConnectionError("Google Drive is unreachable")
+        response = unittest.mock.Mock()
+        response.json.return_value = {"modifiedTime": self.modified_time}
+        return response
+
+    def open_by_key(self, file_id):
+        self.downloads += 1
+        spreadsheet = unittest.mock.Mock()
+        spreadsheet.worksheets.return_value = [
+            unittest.mock.Mock(title=title) for title in ("קטלוג", "אוסף", "הוראות")
+        ]
+        spreadsheet.values_batch_get.return_value = {
+            "valueRanges": [
+                {
+                    "values": [
+                        ["סימול", "כותרת"],
+                        ["ArBe-001", f"מכתב {self.downloads}"],
+                    ]
+                },
+                {"values": [["סימול", "כותרת"], ["ArBe", "אוסף"]]},
+            ]
+        }
+        return spreadsheet
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,25 @@
+from unittest import TestCase, main
+
+
+class TestColumns(TestCase):
+    def test_remove_duplicate_in_column(self):
+        import numpy as np
+        import pandas as pd
+        from VC_collections.columns import remove_duplicate_in_column
+
+        df = pd.DataFrame(
+            {"שפה": ["עברית;אנגלית;עברית;צרפתית", "עברית", np.nan, "אנגלית;עברית"]},
+            index=["ArBe-1", "ArBe-2", "ArBe-3", "ArBe-4"],
+        )
+        df, df_report = remove_duplicate_in_column(df, "שפה", report=True)
+        self.assertEqual(
+            df["שפה"].tolist()[:2] + df["שפה"].tolist()[3:],
+            ["עברית;אנגלית;צרפתית", "עברית", "אנגלית;עברית"],
+        )
+        self.assertTrue(pd.isna(df.loc["ArBe-3", "שפה"]))
+        self.assertEqual(df_report.index.tolist(), ["ArBe-1"])
+        self.assertEqual(df_report.loc["ArBe-1", "duplicates"], "עברית")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+from unittest import TestCase, main
+
+
+class TestDates(TestCase):
+    def test_clean_date_column(self):
+        import pandas as pd
+        from VC_collections.dates import clean_date_column
+
+        series = pd.Series(
+            ["29-09-2010", "1950", "1964-1", "1963-26-12", "1950", "ינואר 1950"]
+        )
+        dates, failures = clean_date_column(series)
+        self.assertEqual(
+            dates.tolist(),
+            ["2010-09-29", "1950", "1964-01", "1963-12-26", "1950", "ינואר 1950"],
+        )
+        self.assertEqual(failures, ["ינואר 1950"])
+
+    def test_date_failures_report(self):
+        import pandas as pd
+        from VC_collections.dates import clean_date_column, date_failures_report
+
+        series = pd.Series(
+            ["1950", "ינואר 1950", "1964-1", "ינואר 1950"],
+            index=["ArBe-1", "ArBe-2", "ArBe-3", "ArBe-4"],
+            name="DATE_START",
+        )
+        _, failures = clean_date_column(series)
+        df_report = date_failures_report(series, failures)
+        self.assertEqual(list(df_report.index), ["ArBe-2", "ArBe-4"])
+        self.assertEqual(df_report["column"].tolist(), ["DATE_START"] * 2)
+        self.assertEqual(df_report["date"].tolist(), ["ינואר 1950"] * 2)
+
+    def test_candidate_formats(self):
+        from VC_collections.dates import FULL_DATES
+
+        self.assertEqual(
+            FULL_DATES.candidate_formats("1963-26-12"), ["%Y-%m-%d", "%Y-%d-%m"]
+        )
+        self.assertEqual(FULL_DATES.candidate_formats("abc"), [])
+
+    def test_cataloguing_month_column(self):
+        import pandas as pd
+        from VC_collections.dates import cataloguing_month_column
+
+        series = pd.Series(["2020-03-01", "01/04/2020", "2020-03"])
+        self.assertEqual(
+            cataloguing_month_column(series).tolist(), ["202003", "202004", "202003"]
+        )
+        with self.assertRaises(SystemExit):
+            cataloguing_month_column(pd.Series(["March 2020"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from unittest import TestCase, main
+
+
+class TestField008(TestCase):
+    def test_patch(self):
+        import pandas as pd
+        from VC_collections.field008 import FIELD_008_TEMPLATE, Field008
+
+        series = pd.Series(
+            [FIELD_008_TEMPLATE] * 3, index=["ArBe-1", "ArBe-2", "ArBe-3"]
+        )
+        field_008 = Field008.from_series(series)
+        field_008.patch(35, ["heb", "eng"], rows=[True, False, True])
+        field_008.patch(18, "is#")
+        result = field_008.to_series()
+
+        self.assertEqual(list(result.index), list(series.index))
+        self.assertEqual(
+            result.str[35:38].tolist(), ["heb", FIELD_008_TEMPLATE[35:38], "eng"]
+        )
+        self.assertEqual(result.str[18:21].tolist(), ["is#"] * 3)
+        self.assertEqual(result.str.len().tolist(), [len(FIELD_008_TEMPLATE)] * 3)
+
+    def test_from_template(self):
+        import pandas as pd
+        from VC_collections.field008 import FIELD_008_TEMPLATE, Field008
+
+        index = pd.Index(["ArBe-1", "ArBe-2"])
+        self.assertEqual(
+            Field008.from_template(index).to_series().tolist(),
+            [FIELD_008_TEMPLATE] * 2,
+        )
+
+    def test_patch_width(self):
+        import pandas as pd
+        from VC_collections.field008 import FIELD_008_TEMPLATE, Field008
+
+        field_008 = Field008.from_series(pd.Series([FIELD_008_TEMPLATE] * 3))
+        field_008.patch(35, ["heb ", "he", "heb"], width=3)
+        self.assertEqual(
+            field_008.to_series().str[34:39].tolist(), ["#heb#", "#he##", "#heb#"]
+        )
+
+    def test_patch_bad_rows(self):
+        import pandas as pd
+        from VC_collections.field008 import FIELD_008_TEMPLATE, Field008
+
+        field_008 = Field008.from_series(
+            pd.Series([FIELD_008_TEMPLATE, "######", None, FIELD_008_TEMPLATE])
+        )
+        with self.assertLogs("VC_collections.field008", level="ERROR"):
+            field_008.patch(35, ["heb", "eng", "ara", "עבר"])
+        self.assertEqual(
+            field_008.to_series().tolist(),
+            [
+                FIELD_008_TEMPLATE[:35] + "heb" + FIELD_008_TEMPLATE[38:],
+                "######",
+                None,
+                FIELD_008_TEMPLATE,
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
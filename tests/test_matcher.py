@@ -0,0 +1,162 @@
+from unittest import TestCase, main
+
+
+class TestVocabularyMatcher(TestCase):
+    def setUp(self):
+        self.choices = [
+            "צילום",
+            "צילומים",
+            "תצלום",
+            "מכתב",
+            "מכתבים",
+            "כתב יד",
+            "Photograph",
+            "Letters",
+        ]
+
+    def test_extract_matches_fuzzywuzzy(self):
+        from fuzzywuzzy import process
+        from VC_collections.matcher import VocabularyMatcher
+
+        matcher = VocabularyMatcher(self.choices)
+        for value in ["צילומ", "מכתבם", "photographs", "letter;", "כתבי יד"]:
+            self.assertEqual(
+                matcher.extract(value, limit=4),
+                process.extract(value, self.choices, limit=4),
+            )
+
+    def test_exact_match(self):
+        from VC_collections.matcher import VocabularyMatcher
+
+        matcher = VocabularyMatcher(self.choices)
+        self.assertIn("מכתבים", matcher)
+        self.assertEqual(matcher.extract("מכתבים", limit=4), [("מכתבים", 100)])
+        self.assertEqual(matcher.extract_one("מכתבים"), ("מכתבים", 100))
+
+    def test_extract_keeps_pruned_candidates(self):
+        from fuzzywuzzy import process
+        from VC_collections.matcher import VocabularyMatcher
+
+        choices = [
+            "צילום",
+            "תצלום",
+            "מכתב",
+            "ספר",
+            "כתב יד",
+            "מפה",
+            "תצלומים",
+            "צלום אויר",
+            "תלומה",
+            "מצלמה",
+        ]
+        matcher = VocabularyMatcher(choices)
+        for value in ["תצלומם", "צילומם", "תצלומ", "מכתבם"]:
+            self.assertEqual(
+                matcher.extract(value, limit=4),
+                process.extract(value, choices, limit=4),
+            )
+        self.assertIn(("צילום", 73), matcher.extract("תצלומם", limit=4))
+
+    def test_extract_random_queries(self):
+        import random
+
+        from fuzzywuzzy import process
+        from VC_collections.matcher import VocabularyMatcher
+
+        rng = random.Random(0)
+        alphabet = "אבגדהוזחטיכלמנסעפצקרשת abc"
+        choices = list(
+            dict.fromkeys(
+                "".join(rng.choice(alphabet) for _ in range(rng.randint(2, 9)))
+                for _ in range(60)
+            )
+        )
+        matcher = VocabularyMatcher(choices)
+        for _ in range(100):
+            value = "".join(rng.choice(alphabet) for _ in range(rng.randint(2, 9)))
+            if value in choices:
+                continue
+            self.assertEqual(
+                matcher.extract(value, limit=3),
+                process.extract(value, choices, limit=3),
+            )
+
+    def test_normalized_index(self):
+        from unittest import mock
+
+        from fuzzywuzzy import process
+        from VC_collections.matcher import VocabularyMatcher, sequence_ratio
+
+        choices = self.choices + ["letters!", "LETTERS", "Letters."]
+        matcher = VocabularyMatcher(choices)
+        with mock.patch.object(matcher, "scores", side_effect=AssertionError):
+            self.assertEqual(
+                matcher.extract("letters;", limit=3),
+                process.extract("letters;", choices, limit=3),
+            )
+        for value, limit in [("letters;", 4), ("  PHOTOGRAPH", 2), ("מכתב!", 1)]:
+            self.assertEqual(
+                matcher.extract(value, limit=limit),
+                process.extract(value, choices, limit=limit),
+            )
+
+        matcher = VocabularyMatcher(choices, scorer=sequence_ratio, normalizer=str)
+        with mock.patch.object(matcher, "scores", side_effect=AssertionError):
+            self.assertEqual(matcher.close_match("LETTERS"), ("LETTERS", 100))
+
+    def test_close_match(self):
+        import difflib
+        from VC_collections.matcher import VocabularyMatcher, sequence_ratio
+
+        # "abcd"/"dcba" share no trigram with "bcda", but their ratio is 0.75
+        choices = self.choices + ["abcd", "dcba", "xbcdx", "ab", "ba"]
+        matcher = VocabularyMatcher(choices, scorer=sequence_ratio, normalizer=str)
+        for value in ["צילומ", "מכתבם", "Leters", "ספר", "bcda", "a", "aab"]:
+            close_matches = difflib.get_close_matches(value, choices, n=1)
+            best = matcher.close_match(value, cutoff=60)
+            self.assertEqual(
+                best[0] if best else None, close_matches[0] if close_matches else None
+            )
+
+    def test_close_match_random_queries(self):
+        import difflib
+        import random
+
+        from VC_collections.matcher import VocabularyMatcher, sequence_ratio
+
+        rng = random.Random(0)
+        choices = list(
+            dict.fromkeys(
+                "".join(rng.choice("abcde") for _ in range(rng.randint(1, 6)))
+                for _ in range(80)
+            )
+        )
+        matcher = VocabularyMatcher(choices, scorer=sequence_ratio, normalizer=str)
+        for _ in range(200):
+            value = "".join(rng.choice("abcde") for _ in range(rng.randint(1, 6)))
+            close_matches = difflib.get_close_matches(value, choices, n=1)
+            best = matcher.close_match(value, cutoff=60)
+            self.assertEqual(
+                best[0] if best else None, close_matches[0] if close_matches else None
+            )
+
+    def test_split_exact_hits(self):
+        from VC_collections.matcher import split_exact_hits
+
+        hits, misses = split_exact_hits(
+            ["מכתבים", "מכתבם", "צילום", "Photo"], set(self.choices)
+        )
+        self.assertEqual(hits, ["מכתבים", "צילום"])
+        self.assertEqual(misses, ["מכתבם", "Photo"])
+
+    def test_check_values_arch_mat(self):
+        import pandas as pd
+        from VC_collections.marc import check_values_arch_mat
+
+        df = pd.DataFrame({"סוג חומר": ["מכתבים;צילום", "מכתבם", "צילום;"]})
+        mapping = {choice: choice for choice in self.choices}
+        self.assertEqual(check_values_arch_mat(df, "סוג חומר", mapping), ["מכתבם"])
+
+
+if __name__ == "__main__":
+    main()
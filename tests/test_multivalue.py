@@ -0,0 +1,65 @@
+from unittest import TestCase, main
+
+
+class TestMultiValueColumn(TestCase):
+    def setUp(self):
+        import numpy as np
+        import pandas as pd
+
+        self.series = pd.Series(
+            ["עברית;אנגלית;עברית", "", np.nan, "צרפתית"],
+            index=["ArBe-1", "ArBe-2", "ArBe-3", "ArBe-4"],
+            name="שפה",
+        )
+
+    def test_parse_and_render(self):
+        from VC_collections.multivalue import MultiValueColumn
+
+        column = MultiValueColumn.from_series(self.series)
+        self.assertEqual(column.lengths.tolist(), [3, 1, 0, 1])
+        self.assertEqual(
+            column.render().tolist(), ["עברית;אנגלית;עברית", "", "", "צרפתית"]
+        )
+        self.assertEqual(column.unique(), ["עברית", "אנגלית", "", "צרפתית"])
+        self.assertEqual(
+            column.map({"עברית": "$$aheb", "אנגלית": "$$aeng"}).render("").tolist(),
+            ["$$aheb$$aeng$$aheb", "", "", "צרפתית"],
+        )
+
+    def test_dedupe_and_filter(self):
+        from VC_collections.multivalue import MultiValueColumn
+
+        column = MultiValueColumn.from_series(self.series)
+        self.assertEqual(
+            column.dedupe().render().tolist(), ["עברית;אנגלית", "", "", "צרפתית"]
+        )
+        self.assertEqual(
+            column.filter(lambda x: x != "עברית").render().tolist(),
+            ["אנגלית", "", "", "צרפתית"],
+        )
+
+    def test_to_columns(self):
+        from VC_collections.multivalue import MultiValueColumn
+
+        df = MultiValueColumn.from_series(self.series).to_columns(start=1)
+        expected = self.series.str.split(";", expand=True)
+        self.assertEqual(list(df.columns), ["שפה_2", "שפה_3", "שפה_4"])
+        self.assertEqual(
+            df.fillna("").values.tolist(), expected.fillna("").values.tolist()
+        )
+
+    def test_append(self):
+        import numpy as np
+        import pandas as pd
+        from VC_collections.multivalue import MultiValueColumn
+
+        column = MultiValueColumn.from_series(self.series)
+        other = MultiValueColumn.from_series(pd.Series(["ערבית", "יידיש", "", np.nan]))
+        self.assertEqual(
+            column.append(other).render().tolist(),
+            ["עברית;אנגלית;עברית;ערבית", ";יידיש", "", "צרפתית"],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import TestCase
+
+import pandas as pd
+
+
+class TestSnapshotStore(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "snapshot"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_save_and_load_sheets(self):
+        from VC_collections.snapshot import SnapshotStore
+
+        df = pd.DataFrame({"שפה": ["עברית", "אנגלית"], "קוד שפה": ["heb", "eng"]})
+        store = SnapshotStore(self.path, "spreadsheet-id")
+        self.assertFalse(store.has_sheet("שפה"))
+
+        store.save_sheets({"שפה": df}, modified_time="2020-10-01T10:00:00.000Z")
+
+        store = SnapshotStore(self.path, "spreadsheet-id")
+        self.assertTrue(store.has_sheets(["שפה"]))
+        self.assertTrue(store.load_sheet("שפה").equals(df))
+        self.assertEqual(
+            store.manifest["modified_time"], "2020-10-01T10:00:00.000Z"
+        )
+        self.assertFalse(store.is_stale(timedelta(hours=1)))
+        self.assertTrue(store.is_stale(timedelta(seconds=-1)))
+
+    def test_snapshot_of_other_spreadsheet_is_ignored(self):
+        from VC_collections.snapshot import SnapshotStore
+
+        SnapshotStore(self.path, "spreadsheet-id").save_sheets(
+            {"שפה": pd.DataFrame({"a": [1]})}
+        )
+        store = SnapshotStore(self.path, "other-spreadsheet-id")
+        self.assertFalse(store.has_sheet("שפה"))
+        self.assertTrue(store.is_stale(timedelta(hours=1)))